@@ -7,9 +7,9 @@ This module provides a unified import interface for all library components.
 
 # Import all commonly used functions and classes
 from .common import (
-    ROOT, Colors, log, warn, error, info,
-    load_config, run_command, run_legacy,
-    get_remote_config, scp, ssh,
+    ROOT, APPLE_BOOT_VARIABLE_GUID, Colors, log, warn, error, info,
+    load_config, reload_config, run_command, run_legacy,
+    get_remote_config, scp, rsync, ssh,
     ensure_directory, read_json_file, write_json_file,
     find_files_by_pattern, cleanup_macos_metadata,
     validate_file_exists, get_project_paths,
@@ -29,7 +29,7 @@ from .data_conversion import (
 
 from .smbios import (
     check_macserial_available, get_macserial_path,
-    generate_smbios_data, generate_uuid, generate_mac_address,
+    generate_smbios_data, generate_smbios_batch, generate_uuid, generate_mac_address,
     is_placeholder_value, is_placeholder_serial,
     is_placeholder_mlb, is_placeholder_uuid, is_placeholder_rom,
     validate_and_generate_smbios, validate_and_generate_serial_mlb_only, 
@@ -38,7 +38,7 @@ from .smbios import (
 )
 
 from .changeset import (
-    load_changeset, save_changeset,
+    load_changeset, load_changeset_section, save_changeset,
     validate_changeset_structure, get_changeset_summary,
     compare_changesets, merge_changesets,
     extract_changeset_section, update_changeset_section,
@@ -55,9 +55,9 @@ from .paths import paths
 __version__ = "1.0.0"
 __all__ = [
     # Common utilities
-    'ROOT', 'Colors', 'log', 'warn', 'error', 'info',
-    'load_config', 'run_command', 'run_legacy',
-    'get_remote_config', 'scp', 'ssh',
+    'ROOT', 'APPLE_BOOT_VARIABLE_GUID', 'Colors', 'log', 'warn', 'error', 'info',
+    'load_config', 'reload_config', 'run_command', 'run_legacy',
+    'get_remote_config', 'scp', 'rsync', 'ssh',
     'ensure_directory', 'read_json_file', 'write_json_file',
     'find_files_by_pattern', 'cleanup_macos_metadata',
     'validate_file_exists', 'get_project_paths',
@@ -75,14 +75,14 @@ __all__ = [
     
     # SMBIOS utilities
     'check_macserial_available', 'get_macserial_path',
-    'generate_smbios_data', 'generate_uuid', 'generate_mac_address',
+    'generate_smbios_data', 'generate_smbios_batch', 'generate_uuid', 'generate_mac_address',
     'is_placeholder_value', 'is_placeholder_serial',
     'is_placeholder_mlb', 'is_placeholder_uuid', 'is_placeholder_rom',
     'validate_and_generate_smbios', 'get_smbios_info',
     'validate_smbios_format',
     
     # Changeset management
-    'load_changeset', 'save_changeset',
+    'load_changeset', 'load_changeset_section', 'save_changeset',
     'validate_changeset_structure', 'get_changeset_summary',
     'compare_changesets', 'merge_changesets',
     'extract_changeset_section', 'update_changeset_section',
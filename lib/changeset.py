@@ -7,6 +7,7 @@ OpenCore configuration changesets.
 """
 
 import yaml
+import os
 import sys
 import plistlib
 import subprocess
@@ -18,6 +19,13 @@ sys.path.append(str(Path(__file__).parent))
 from common import ROOT, log, warn, error, get_changeset_path, list_available_changesets
 from data_conversion import convert_changeset_data_types
 
+# Prefer the libyaml-backed loader/dumper; fall back to pure Python if PyYAML
+# was built without libyaml
+try:
+    from yaml import CSafeLoader as YamlLoader, CSafeDumper as YamlDumper
+except ImportError:
+    from yaml import SafeLoader as YamlLoader, SafeDumper as YamlDumper
+
 def load_changeset(changeset_name: str) -> Optional[Dict[str, Any]]:
     """Load a changeset from file"""
     changeset_path = get_changeset_path(changeset_name)
@@ -28,33 +36,87 @@ def load_changeset(changeset_name: str) -> Optional[Dict[str, Any]]:
     
     try:
         with open(changeset_path, 'r') as f:
-            changeset_data = yaml.safe_load(f)
+            changeset_data = yaml.load(f, Loader=YamlLoader)
         log(f"Loaded changeset: {changeset_name}")
         return changeset_data
     except Exception as e:
         error(f"Failed to load changeset {changeset_name}: {e}")
         return None
 
+def load_changeset_section(changeset_name: str, section_name: str) -> Optional[Any]:
+    """Load a single top-level section from a changeset without parsing the rest
+
+    Only the lines belonging to the section are handed to the YAML loader, so
+    callers that need one small block (e.g. SMBIOS data) of a large changeset
+    don't pay for parsing kernel patches and device properties. Falls back to
+    a full load if the slice cannot be parsed on its own.
+    """
+    changeset_path = get_changeset_path(changeset_name)
+    if not changeset_path.exists():
+        return None
+    
+    header = f"{section_name}:"
+    section_lines = []
+    with open(changeset_path, 'r') as f:
+        for line in f:
+            if section_lines:
+                # Block ends at the next unindented key; block sequences may
+                # sit at column 0 under their key
+                if line[:1] not in ('', ' ', '\t', '-', '#', '\n', '\r') or line.startswith(('---', '...')):
+                    break
+                section_lines.append(line)
+            elif line.startswith(header) and line[len(header):len(header) + 1] in ('', ' ', '\t', '\n', '\r'):
+                section_lines.append(line)
+    
+    if not section_lines:
+        return None
+    
+    try:
+        data = yaml.load(''.join(section_lines), Loader=YamlLoader)
+        return data.get(section_name) if isinstance(data, dict) else None
+    except yaml.YAMLError:
+        # e.g. aliases pointing at anchors in other sections
+        changeset_data = load_changeset(changeset_name)
+        return changeset_data.get(section_name) if changeset_data else None
+
 def save_changeset(changeset_name: str, changeset_data: Dict[str, Any], backup: bool = True) -> bool:
-    """Save changeset data to file"""
+    """Save changeset data to file
+    
+    The YAML is written to a temporary file next to the changeset and renamed
+    over it, so an interrupted save never leaves a truncated changeset behind.
+    """
     changeset_path = get_changeset_path(changeset_name)
+    tmp_path = changeset_path.with_suffix('.yaml.tmp')
+    
+    try:
+        body = yaml.dump(changeset_data, Dumper=YamlDumper, default_flow_style=False, sort_keys=False)
+        with open(tmp_path, 'w') as f:
+            f.write(body)
+    except Exception as e:
+        tmp_path.unlink(missing_ok=True)
+        error(f"Failed to save changeset {changeset_name}: {e}")
+        return False
     
-    # Create backup if requested
+    # Create backup if requested; a hard link keeps the old contents without copying them
     if backup and changeset_path.exists():
         backup_path = changeset_path.with_suffix('.yaml.backup')
         try:
-            import shutil
-            shutil.copy2(changeset_path, backup_path)
+            backup_path.unlink(missing_ok=True)
+            try:
+                os.link(changeset_path, backup_path)
+            except OSError:
+                import shutil
+                shutil.copy2(changeset_path, backup_path)
             log(f"Created backup: {backup_path}")
         except Exception as e:
             warn(f"Failed to create backup: {e}")
     
     try:
-        with open(changeset_path, 'w') as f:
-            yaml.safe_dump(changeset_data, f, default_flow_style=False, sort_keys=False)
+        os.replace(tmp_path, changeset_path)
         log(f"Saved changeset: {changeset_name}")
         return True
     except Exception as e:
+        tmp_path.unlink(missing_ok=True)
         error(f"Failed to save changeset {changeset_name}: {e}")
         return False
 
@@ -317,8 +379,7 @@ def load_amd_vanilla_patches() -> Optional[List[Dict[str, Any]]]:
         return None
     
     try:
-        with open(patches_cache, 'rb') as f:
-            plist_data = plistlib.load(f)
+        plist_data = plistlib.loads(patches_cache.read_bytes())
         
         # Extract Kernel -> Patch array
         if 'Kernel' in plist_data and 'Patch' in plist_data['Kernel']:
@@ -352,8 +413,7 @@ def modify_amd_core_count_patches(patches: List[Dict[str, Any]], core_count: int
         patch_copy = patch.copy()
         
         # Look for cpuid_cores_per_package patches
-        if (patch.get('Comment', '').lower().find('cpuid_cores_per_package') >= 0 or
-            patch.get('Comment', '').lower().find('force cpuid_cores_per_package') >= 0):
+        if 'cpuid_cores_per_package' in patch.get('Comment', '').lower():
             
             core_patches_found += 1
             
@@ -7,15 +7,22 @@ the various Python scripts in the project.
 """
 
 import os
+import re
 import sys
 import subprocess
 import shlex
+import shutil
 import json
+import functools
 from pathlib import Path
 
 # Project root directory
 ROOT = Path(__file__).resolve().parents[1]
 
+# NVRAM GUID that holds boot-args, csr-active-config, etc. Interned once so
+# every script compares against the same string object
+APPLE_BOOT_VARIABLE_GUID = sys.intern('7C436110-AB2A-4BBB-A880-FE41995C9F82')
+
 # Color constants for terminal output
 class Colors:
     GREEN = '\033[0;32m'
@@ -29,23 +36,51 @@ def warn(msg): print(f"{Colors.YELLOW}[!]{Colors.NC} {msg}")
 def error(msg): print(f"{Colors.RED}[ERROR]{Colors.NC} {msg}")
 def info(msg): print(f"{Colors.BLUE}[INFO]{Colors.NC} {msg}")
 
+# KEY=VALUE line in deploy.env; the value is either a matching quote pair
+# (quotes dropped) or the bare remainder of the line
+_ENV_LINE_RE = re.compile(
+    r'^[^\S\n]*([^\s#=][^=\n]*?)[^\S\n]*=[^\S\n]*'
+    r'(?:"([^"\n]*)"|\'([^\'\n]*)\'|([^\n]*?))[^\S\n]*$',
+    re.MULTILINE,
+)
+
+# Set once deploy.env has been read into os.environ
+_config_loaded = False
+
 def load_config():
-    """Load configuration from deploy.env file"""
+    """Load configuration from deploy.env file (once per process)"""
+    global _config_loaded
+    if _config_loaded:
+        return
+    _config_loaded = True
+    
     env_file = ROOT / 'config' / 'deploy.env'
     if env_file.exists():
         try:
             with open(env_file, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if line and not line.startswith('#') and '=' in line:
-                        key, value = line.split('=', 1)
-                        # Remove quotes if present
-                        value = value.strip('"\'')
-                        os.environ[key.strip()] = value
+                content = f.read()
+            for match in _ENV_LINE_RE.finditer(content):
+                key, double_quoted, single_quoted, bare = match.groups()
+                if double_quoted is not None:
+                    value = double_quoted
+                elif single_quoted is not None:
+                    value = single_quoted
+                else:
+                    value = bare
+                os.environ[key] = value
         except Exception as e:
             warn(f"Could not load {env_file}: {e}")
     else:
         warn(f"{env_file} not found, using defaults")
+    
+    # The environment may have changed under a cached remote config
+    get_remote_config.cache_clear()
+
+def reload_config():
+    """Re-read deploy.env and drop the cached remote config"""
+    global _config_loaded
+    _config_loaded = False
+    load_config()
 
 def run_command(cmd: str, description=None, check=True, capture_output=False):
     """Execute a local command with proper error handling"""
@@ -74,8 +109,9 @@ def run_legacy(cmd: str):
     print(f'[+] {cmd}')
     subprocess.check_call(cmd, shell=True, cwd=ROOT)
 
+@functools.lru_cache(maxsize=None)
 def get_remote_config():
-    """Get remote connection configuration"""
+    """Get remote connection configuration (cached; treat as read-only)"""
     return {
         'host': os.getenv('PROXMOX_HOST', os.getenv('REMOTE_SSH_HOST', '10.0.1.10').replace('root@', '')),
         'user': 'root',  # Always root for Proxmox
@@ -85,18 +121,39 @@ def get_remote_config():
         'remote_img_dir': os.getenv('REMOTE_IMG_DIR', '/var/lib/vz/images')
     }
 
-def scp(local: Path, remote: str):
-    """Copy file to remote host"""
+# Share one SSH connection between back-to-back scp/rsync/ssh calls so only
+# the first pays for the handshake
+_SSH_MUX_OPTS = '-o ControlMaster=auto -o ControlPersist=60s -o ControlPath=~/.ssh/cm-%r@%h:%p'
+
+def scp(local: Path, remote: str, compress: bool = False):
+    """Copy file to remote host, optionally compressing it on the wire"""
     config = get_remote_config()
     host = config['host']
     user = config['user']
     
     log(f'Copying {local} to {user}@{host}:{remote}')
-    cmd = f'scp "{local}" {user}@{host}:"{remote}"'
+    flags = '-C ' if compress else ''
+    cmd = f'scp {flags}{_SSH_MUX_OPTS} "{local}" {user}@{host}:"{remote}"'
+    return run_command(cmd, check=True)
+
+def rsync(local: Path, remote: str, compress: bool = False):
+    """Copy file to remote host, sending only changed blocks of an existing copy"""
+    if shutil.which('rsync') is None:
+        warn("rsync not found, falling back to scp")
+        return scp(local, remote, compress=compress)
+    
+    config = get_remote_config()
+    host = config['host']
+    user = config['user']
+    
+    log(f'Syncing {local} to {user}@{host}:{remote}')
+    flags = '--compress ' if compress else ''
+    cmd = (f'rsync -e "ssh {_SSH_MUX_OPTS}" --inplace --partial --no-whole-file {flags}'
+           f'"{local}" {user}@{host}:"{remote}"')
     return run_command(cmd, check=True)
 
-def ssh(cmd: str):
-    """Execute command on remote host"""
+def ssh(cmd: str, stdin: Path = None, compress: bool = False):
+    """Execute command on remote host, optionally feeding a local file to its stdin"""
     config = get_remote_config()
     host = config['host']
     user = config['user']
@@ -104,7 +161,10 @@ def ssh(cmd: str):
     log(f'SSH: {cmd}')
     # Use shlex.quote to properly escape the command for SSH
     escaped_cmd = shlex.quote(cmd)
-    ssh_cmd = f"ssh {user}@{host} {escaped_cmd}"
+    flags = '-C ' if compress else ''
+    ssh_cmd = f"ssh {flags}{_SSH_MUX_OPTS} {user}@{host} {escaped_cmd}"
+    if stdin is not None:
+        ssh_cmd += f' < "{stdin}"'
     return run_command(ssh_cmd, check=True)
 
 def ensure_directory(path: Path):
@@ -144,18 +204,16 @@ def cleanup_macos_metadata(directory: Path):
     count = 0
     for root, dirs, files in os.walk(directory):
         # Remove ._* files
-        for file in files[:]:  # Use slice copy to modify during iteration
+        for file in files:
             if file.startswith('._'):
-                file_path = os.path.join(root, file)
-                os.remove(file_path)
-                count += 1
-        # Remove __MACOSX directories
-        for dir_name in dirs[:]:  # Use slice copy to modify during iteration
-            if dir_name == '__MACOSX':
-                dir_path = os.path.join(root, dir_name)
-                import shutil
-                shutil.rmtree(dir_path)
+                os.remove(os.path.join(root, file))
                 count += 1
+        # Remove __MACOSX directories, and drop them from dirs so the walk
+        # doesn't try to descend into what was just deleted
+        if '__MACOSX' in dirs:
+            shutil.rmtree(os.path.join(root, '__MACOSX'))
+            dirs.remove('__MACOSX')
+            count += 1
     
     if count > 0:
         log(f"Cleaned up {count} macOS metadata files")
@@ -244,14 +302,20 @@ def get_changeset_path(changeset_name: str):
     changeset_path = paths['changesets'] / changeset_name
     return changeset_path
 
+def _scan_changesets(changesets_dir: Path):
+    """Return DirEntry objects for the *.yaml files in the changesets directory"""
+    with os.scandir(changesets_dir) as it:
+        return [e for e in it if e.name.endswith('.yaml') and e.is_file()]
+
 def list_available_changesets():
     """List all available changeset files"""
     paths = get_project_paths()
     if not paths['changesets'].exists():
         return []
     
-    changesets = list(paths['changesets'].glob('*.yaml'))
-    return [cs.stem for cs in sorted(changesets)]
+    # Sort on the file name (not the stem) to keep the order Path sorting gave
+    names = sorted(e.name for e in _scan_changesets(paths['changesets']))
+    return [name[:-5] for name in names]
 
 def list_newest_changesets(limit=5):
     """List the newest changeset files by modification time"""
@@ -259,16 +323,16 @@ def list_newest_changesets(limit=5):
     if not paths['changesets'].exists():
         return []
     
-    changesets = list(paths['changesets'].glob('*.yaml'))
+    changesets = _scan_changesets(paths['changesets'])
     if not changesets:
         return []
     
     # Sort by modification time (newest first)
-    changesets_with_mtime = [(cs, cs.stat().st_mtime) for cs in changesets]
+    changesets_with_mtime = [(e.name[:-5], e.stat().st_mtime) for e in changesets]
     changesets_with_mtime.sort(key=lambda x: x[1], reverse=True)
     
     # Return only the names, limited to specified count
-    return [cs.stem for cs, _ in changesets_with_mtime[:limit]]
+    return [name for name, _ in changesets_with_mtime[:limit]]
 
 def validate_changeset_exists(changeset_name: str) -> Path:
     """Validate that a changeset exists and return its path"""
@@ -19,7 +19,9 @@ class CustomJSONEncoder(json.JSONEncoder):
 
 def convert_data_values(obj: Any) -> Any:
     """Convert data values to proper format for plist handling"""
-    if isinstance(obj, dict):
+    # Exact type checks: YAML and plist loaders only produce plain dict/list
+    kind = type(obj)
+    if kind is dict:
         result = {}
         for key, value in obj.items():
             if key == 'built-in' and isinstance(value, list):
@@ -39,7 +41,7 @@ def convert_data_values(obj: Any) -> Any:
             else:
                 result[key] = convert_data_values(value)
         return result
-    elif isinstance(obj, list):
+    elif kind is list:
         return [convert_data_values(item) for item in obj]
     else:
         return obj
@@ -170,11 +172,12 @@ def convert_changeset_data_types(changeset_data: Dict[str, Any]) -> Dict[str, An
 
 def prepare_json_serializable(data: Any) -> Any:
     """Prepare data for JSON serialization by converting bytes to lists"""
-    if isinstance(data, dict):
+    kind = type(data)
+    if kind is dict:
         return {key: prepare_json_serializable(value) for key, value in data.items()}
-    elif isinstance(data, list):
+    elif kind is list:
         return [prepare_json_serializable(item) for item in data]
-    elif isinstance(data, bytes):
+    elif kind is bytes:
         return list(data)
     else:
         return data
@@ -50,7 +50,7 @@ def deploy_to_proxmox(changeset_name=None, force_rebuild=False):
     
     # If rebuilding, fetch assets first if they don't exist
     if force_rebuild:
-        ocvalidate_path = paths.opencore_root / "Utilities" / "ocvalidate" / "ocvalidate"
+        ocvalidate_path = paths.ocvalidate
         if not ocvalidate_path.exists():
             log("Fetching OpenCore assets for rebuild...")
             fetch_script = ROOT / "scripts" / "fetch-assets.py"
@@ -61,7 +61,7 @@ def deploy_to_proxmox(changeset_name=None, force_rebuild=False):
                 return False
     else:
         # Check that OpenCore assets are available for validation
-        ocvalidate_path = paths.opencore_root / "Utilities" / "ocvalidate" / "ocvalidate"
+        ocvalidate_path = paths.ocvalidate
         if not ocvalidate_path.exists():
             error("OpenCore tools not found")
             error(f"Expected ocvalidate at: {ocvalidate_path}")
@@ -220,7 +220,7 @@ def build_iso_only(changeset_name=None, force_rebuild=False):
         
         # Validate the configuration (only if ocvalidate exists)
         validate_script = ROOT / "scripts" / "validate.sh"
-        ocvalidate_path = paths.opencore_root / "Utilities" / "ocvalidate" / "ocvalidate"
+        ocvalidate_path = paths.ocvalidate
         if ocvalidate_path.exists():
             log("Validating OpenCore configuration...")
             if not run_command(f'bash "{validate_script}"', "Validating configuration"):
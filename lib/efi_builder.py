@@ -7,6 +7,8 @@ artifacts. Ensures all components (ACPI, Drivers, Tools, Kexts, etc.) are
 properly included.
 """
 
+import os
+import sys
 import shutil
 import subprocess
 import yaml
@@ -18,13 +20,14 @@ import json
 import yaml
 from . import ROOT, log, warn, error, info, run_command, ensure_directory, cleanup_macos_metadata
 from .paths import paths as pm
+from .changeset import YamlLoader
 
 def _load_changeset_yaml(changeset_name: str):
     """Load changeset YAML as a Python dict or return None on error."""
     cs_path = pm.changesets / f"{changeset_name}.yaml"
     try:
         with open(cs_path, 'r') as f:
-            return yaml.safe_load(f)
+            return yaml.load(f, Loader=YamlLoader)
     except Exception as e:
         error(f"Failed to load changeset: {e}")
         return None
@@ -396,12 +399,28 @@ def copy_efi_for_build(source_efi_dir, target_build_dir, force_clean=True):
 
 
 def _validate_config_if_available() -> bool:
-    """Run config validation if ocvalidate is available."""
-    validate_script = pm.scripts / 'validate-config.py'
-    if pm.ocvalidate.exists() and validate_script.exists():
-        return run_command(f'python3.11 "{validate_script}"', "Validating configuration")
+    """Run ocvalidate on the built config.plist if it is available."""
     if not pm.ocvalidate.exists():
         warn("Skipping validation (ocvalidate not available)")
+        return True
+    # Call ocvalidate directly rather than through validate-config.py, which
+    # would cost a second Python interpreter just to launch it
+    config_file = pm.oc_efi / 'config.plist'
+    log("Validating configuration")
+    result = subprocess.run(
+        [str(pm.ocvalidate), str(config_file.resolve())],
+        capture_output=True,
+        text=True,
+        close_fds=False
+    )
+    if result.stdout:
+        print(result.stdout.strip())
+    if result.stderr:
+        print(result.stderr.strip())
+    if result.returncode != 0:
+        error("✗ Configuration validation failed")
+        return False
+    log("✓ Configuration is valid")
     return True
 
 
@@ -445,8 +464,35 @@ def build_iso_artifact(changeset_name: str, force_rebuild=False, no_validate=Fal
     return False
 
 
-def build_img_artifact(changeset_name: str, force_rebuild=False, no_validate=False, apply_changeset: bool = True) -> bool:
-    """Build EFI then create a 50MB .img under build_root."""
+def _img_cache_path(changeset_name: str) -> Path:
+    """Cached IMG for the current EFI build; the key covers this module too so edits invalidate it"""
+    digest = hashlib.sha256(Path(__file__).read_bytes())
+    digest.update(sys.platform.encode())
+    efi_root = pm.efi_build / 'EFI'
+    for path in sorted(p for p in efi_root.rglob('*') if p.is_file()):
+        digest.update(path.relative_to(efi_root).as_posix().encode() + b'\0')
+        digest.update(path.read_bytes())
+    # Markers are empty; only their names end up on the image
+    for marker in sorted(pm.efi_build.glob('*.changeset')):
+        digest.update(marker.name.encode() + b'\0')
+    return pm.out / 'cache' / 'img' / f"opencore-{changeset_name}-{digest.hexdigest()[:16]}.img"
+
+
+def _link_or_copy(src: Path, dst: Path):
+    """Hard-link src to dst, copying when the filesystem can't link"""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+def build_img_artifact(changeset_name: str, force_rebuild=False, no_validate=False, apply_changeset: bool = True,
+                       use_cache: bool = True) -> bool:
+    """Build EFI then create a 50MB .img under build_root.
+
+    An IMG built from an identical EFI tree is reused from out/cache/img
+    unless force_rebuild or use_cache=False; fresh builds are always cached.
+    """
     log("Building OpenCore IMG...")
     ocvalidate_path = pm.ocvalidate
     if not ocvalidate_path.exists():
@@ -473,6 +519,12 @@ def build_img_artifact(changeset_name: str, force_rebuild=False, no_validate=Fal
     if dmg_path.exists():
         dmg_path.unlink()
 
+    cache_path = _img_cache_path(changeset_name)
+    if use_cache and not force_rebuild and cache_path.exists():
+        _link_or_copy(cache_path, img_path)
+        log(f"✓ EFI tree unchanged; reused cached IMG: {img_path}")
+        return True
+
     # macOS approach using hdiutil, else Linux loopback
     import sys as _sys
     import subprocess as _sp
@@ -536,6 +588,15 @@ def build_img_artifact(changeset_name: str, force_rebuild=False, no_validate=Fal
                 log("Unmounting disk image...")
                 _sp.run(['sudo', 'umount', temp_mount], capture_output=True, check=False)
 
+    # Keep only the newest cached IMG per changeset
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        for stale in cache_path.parent.glob(f"opencore-{changeset_name}-*.img"):
+            stale.unlink()
+        _link_or_copy(img_path, cache_path)
+    except OSError as e:
+        warn(f"Could not cache IMG: {e}")
+
     log(f"✓ OpenCore IMG built successfully: {img_path}")
     return True
     
@@ -11,7 +11,7 @@ import re
 import uuid
 import sys
 from pathlib import Path
-from typing import Dict, Tuple, Optional, Any
+from typing import Dict, List, Tuple, Optional, Any
 
 # Import common utilities
 sys.path.append(str(Path(__file__).parent))
@@ -28,12 +28,15 @@ def get_macserial_path() -> Path:
     validate_file_exists(macserial_path, "macserial utility")
     return macserial_path
 
-def generate_smbios_data(model: str = "iMacPro1,1") -> Tuple[str, str]:
-    """Generate SMBIOS data using macserial utility"""
+# Serial/MLB pairs generated ahead of time, per model, by batched macserial runs
+_serial_pool: Dict[str, List[Tuple[str, str]]] = {}
+
+def generate_smbios_batch(model: str = "iMacPro1,1", count: int = 1) -> List[Tuple[str, str]]:
+    """Generate count serial/MLB pairs with a single macserial run"""
     macserial_path = get_macserial_path()
     
-    # Run macserial to generate serial and MLB for specific model
-    cmd = [str(macserial_path), "-m", model]
+    # Run macserial to generate serials and MLBs for specific model
+    cmd = [str(macserial_path), "-n", str(count), "-m", model]
     result = subprocess.run(cmd, capture_output=True, text=True)
     
     if result.returncode != 0:
@@ -41,24 +44,32 @@ def generate_smbios_data(model: str = "iMacPro1,1") -> Tuple[str, str]:
     
     # Parse output - format without -a flag is: "Serial | MLB" (one per line)
     output = result.stdout.strip()
-    lines = output.split('\n')
+    pairs = []
+    for line in output.split('\n'):
+        parts = line.split('|')
+        if len(parts) >= 2:
+            # Without -a flag: parts[0] = Serial, parts[1] = MLB
+            pairs.append((parts[0].strip(), parts[1].strip()))
     
-    # Get the first valid line with a pipe separator
-    for line in lines:
-        line = line.strip()
-        if '|' in line:
-            parts = line.split('|')
-            if len(parts) >= 2:
-                # Without -a flag: parts[0] = Serial, parts[1] = MLB
-                serial = parts[0].strip()
-                mlb = parts[1].strip()
-                return serial, mlb
+    if not pairs:
+        raise RuntimeError(f"Could not parse macserial output: {output}")
+    return pairs
+
+def generate_smbios_data(model: str = "iMacPro1,1", count: int = 1) -> Tuple[str, str]:
+    """Generate SMBIOS data using macserial utility
     
-    raise RuntimeError(f"Could not parse macserial output: {output}")
+    When the pool for the model is empty, macserial is run once for count
+    pairs; the extras are handed out by later calls in the same process.
+    """
+    pool = _serial_pool.setdefault(model, [])
+    if not pool:
+        pool.extend(generate_smbios_batch(model, max(count, 1)))
+    return pool.pop(0)
 
 def generate_uuid() -> str:
     """Generate a random UUID"""
-    return str(uuid.uuid4()).upper()
+    h = uuid.uuid4().hex.upper()
+    return f"{h[0:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:32]}"
 
 def generate_mac_address() -> bytes:
     """Generate a random MAC address with Apple OUI"""
@@ -91,24 +102,16 @@ PLACEHOLDER_PATTERNS = {
     ]
 }
 
+# Every pattern above is compared for equality, so look them up in a set
+_PLACEHOLDER_SETS = {kind: frozenset(patterns) for kind, patterns in PLACEHOLDER_PATTERNS.items()}
+
 def is_placeholder_value(value: str, value_type: str) -> bool:
     """Check if a value is a placeholder that should be replaced"""
-    if not value or value.strip() == '':
+    if not value:
         return True
     
     value = value.strip()
-    patterns = PLACEHOLDER_PATTERNS.get(value_type, [])
-    
-    for pattern in patterns:
-        if isinstance(pattern, str):
-            if value == pattern:
-                return True
-        else:
-            # It's a regex pattern
-            if re.match(pattern, value) and 'PLACEHOLDER' in value.upper():
-                return True
-    
-    return False
+    return not value or value in _PLACEHOLDER_SETS.get(value_type, ())
 
 def is_placeholder_serial(serial: str) -> bool:
     """Check if serial number is a placeholder"""
@@ -165,13 +168,17 @@ def _validate_and_generate_smbios_selective(
     update_mlb: bool = True,
     update_uuid: bool = True,
     update_rom: bool = True
-) -> bool:
-    """Generic SMBIOS generation function that can selectively generate fields"""
+) -> Dict[str, Any]:
+    """Generic SMBIOS generation function that can selectively generate fields
+    
+    Returns a dict of the changed fields keyed by their dotted changeset path;
+    it is empty (and therefore falsy) when nothing was generated or changed.
+    """
     smbios, section_path = get_smbios_section(changeset_data)
     
     if not smbios:
         warn("No PlatformInfo.Generic or SMBIOS section found in changeset")
-        return False
+        return {}
     
     log(f"Using {section_path} for SMBIOS data")
     
@@ -181,18 +188,15 @@ def _validate_and_generate_smbios_selective(
     current_uuid = smbios.get('SystemUUID', '')
     current_rom = smbios.get('ROM', [])
     
-    # Check what needs generation based on what we're supposed to generate
-    checks = []
-    if update_serial:
-        checks.append(is_placeholder_serial(current_serial))
-    if update_mlb:
-        checks.append(is_placeholder_mlb(current_mlb))
-    if update_uuid:
-        checks.append(is_placeholder_uuid(current_uuid))
-    if update_rom:
-        checks.append(is_placeholder_rom(current_rom))
-    
-    needs_generation = force or any(checks)
+    # Check what needs generation based on what we're supposed to generate;
+    # any() stops at the first placeholder found
+    checks = (
+        (update_serial, is_placeholder_serial, current_serial),
+        (update_mlb, is_placeholder_mlb, current_mlb),
+        (update_uuid, is_placeholder_uuid, current_uuid),
+        (update_rom, is_placeholder_rom, current_rom),
+    )
+    needs_generation = force or any(check(value) for wanted, check, value in checks if wanted)
     
     if not needs_generation:
         fields = []
@@ -202,12 +206,12 @@ def _validate_and_generate_smbios_selective(
         if update_rom: fields.append("ROM")
         log(f"{' and '.join(fields)} appear to be real (not placeholder)")
         warn(f"No changes made. Use --force to regenerate {' and '.join(fields)} anyway")
-        return False
+        return {}
     
     # Only check macserial if we need to generate serial/MLB
     if (update_serial or update_mlb) and not check_macserial_available():
         error("macserial utility not available. Please run './ozzy fetch' first.")
-        return False
+        return {}
     
     try:
         # Build description of what we're generating
@@ -273,11 +277,18 @@ def _validate_and_generate_smbios_selective(
             else:
                 log(f"Preserving ROM: {current_rom}")
         
-        # Update changeset data
-        smbios['SystemSerialNumber'] = new_serial
-        smbios['MLB'] = new_mlb
-        smbios['SystemUUID'] = new_uuid
-        smbios['ROM'] = new_rom  # This will be a hex string
+        # Update changeset data, recording which fields actually changed
+        new_values = {
+            'SystemSerialNumber': new_serial,
+            'MLB': new_mlb,
+            'SystemUUID': new_uuid,
+            'ROM': new_rom,  # This will be a hex string
+        }
+        updates = {}
+        for field, value in new_values.items():
+            if smbios.get(field) != value:
+                updates[f"{section_path}.{field}"] = value
+        smbios.update(new_values)
         
         # Also update NVRAM section if it exists and copying is enabled
         copy_to_nvram = changeset_data.get('PlatformInfoGenericCopyToNvramForAppleId', True)
@@ -285,38 +296,38 @@ def _validate_and_generate_smbios_selective(
             apple_guid = '4D1EDE05-38C7-4A6A-9CC6-4BCCA8B38C14'
             if apple_guid in changeset_data['Nvram']['add']:
                 nvram_section = changeset_data['Nvram']['add'][apple_guid]
-                nvram_section['SystemSerialNumber'] = new_serial
-                nvram_section['MLB'] = new_mlb
-                nvram_section['SystemUUID'] = new_uuid
-                # For NVRAM, store as hex string too (the data conversion layer will handle base64)
-                nvram_section['ROM'] = new_rom
+                # For NVRAM, store ROM as hex string too (the data conversion layer will handle base64)
+                for field, value in new_values.items():
+                    if nvram_section.get(field) != value:
+                        updates[f"Nvram.add.{apple_guid}.{field}"] = value
+                nvram_section.update(new_values)
                 
                 if preserving:
                     log(f"Updated NVRAM section with new {' and '.join(generating)} (preserved {' and '.join(preserving)})")
                 else:
                     log("Updated NVRAM section with new SMBIOS data")
         
-        return True
+        return updates
         
     except Exception as e:
         error(f"Failed to generate SMBIOS data: {e}")
-        return False
+        return {}
 
-def validate_and_generate_smbios(changeset_data: Dict[str, Any], force: bool = False) -> bool:
+def validate_and_generate_smbios(changeset_data: Dict[str, Any], force: bool = False) -> Dict[str, Any]:
     """Validate SMBIOS data and generate new values if needed"""
     return _validate_and_generate_smbios_selective(
         changeset_data, force, 
         update_serial=True, update_mlb=True, update_uuid=True, update_rom=True
     )
 
-def validate_and_generate_serial_mlb_only(changeset_data: Dict[str, Any], force: bool = False) -> bool:
+def validate_and_generate_serial_mlb_only(changeset_data: Dict[str, Any], force: bool = False) -> Dict[str, Any]:
     """Validate SMBIOS data and generate new serial and MLB only, preserving UUID and ROM"""
     return _validate_and_generate_smbios_selective(
         changeset_data, force,
         update_serial=True, update_mlb=True, update_uuid=False, update_rom=False
     )
 
-def validate_and_generate_rom_uuid_only(changeset_data: Dict[str, Any], force: bool = False) -> bool:
+def validate_and_generate_rom_uuid_only(changeset_data: Dict[str, Any], force: bool = False) -> Dict[str, Any]:
     """Validate SMBIOS data and generate new ROM and UUID only, preserving serial and MLB"""
     return _validate_and_generate_smbios_selective(
         changeset_data, force,
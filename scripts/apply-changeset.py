@@ -6,6 +6,7 @@ This script applies OpenCore configuration changesets by merging them with
 the base OpenCore configuration template.
 """
 
+import re
 import sys
 import argparse
 import yaml
@@ -16,17 +17,20 @@ from pathlib import Path
 # Import our common libraries
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 from lib import (
-    ROOT, log, warn, error,
+    ROOT, APPLE_BOOT_VARIABLE_GUID, log, warn, error,
     convert_data_values, CustomJSONEncoder,
     validate_file_exists, validate_changeset_exists
 )
-from lib.changeset import apply_amd_vanilla_patches_to_data, get_amd_vanilla_patch_info
+from lib.changeset import YamlLoader, apply_amd_vanilla_patches_to_data, get_amd_vanilla_patch_info
 
 # Project-specific paths
 EFI = ROOT / "out" / "build" / "efi" / "EFI" / "OC"
 TEMPLATE_PLIST = ROOT / "assets" / "config.plist.TEMPLATE"
 PATCHER = ROOT / "scripts" / "patch-plist.py"
 
+# Comment markers of AMD kernel patches ('amd' also covers AuthenticAMD)
+_AMD_COMMENT_RE = re.compile(r'amd|algrey', re.IGNORECASE)
+
 def copy_acpi_files(acpi_files):
     """Copy ACPI .aml files from OpenCore samples or assets directory to the ACPI directory"""
     if not acpi_files:
@@ -414,7 +418,7 @@ def changeset_to_operations(changeset_data):
         
         operations.append({
             "op": "set",
-            "path": ["NVRAM", "Add", "7C436110-AB2A-4BBB-A880-FE41995C9F82", "boot-args"],
+            "path": ["NVRAM", "Add", APPLE_BOOT_VARIABLE_GUID, "boot-args"],
             "value": final_boot_args
         })
 
@@ -430,7 +434,7 @@ def changeset_to_operations(changeset_data):
             csr_bytes = csr_config
         operations.append({
             "op": "set", 
-            "path": ["NVRAM", "Add", "7C436110-AB2A-4BBB-A880-FE41995C9F82", "csr-active-config"],
+            "path": ["NVRAM", "Add", APPLE_BOOT_VARIABLE_GUID, "csr-active-config"],
             "value": csr_bytes
         })
     
@@ -889,8 +893,7 @@ def post_process_config(config_path, changeset_name=None):
         return xml_content.replace('\t', ' ' * spaces)
     
     # Load the config
-    with open(config_path, 'rb') as f:
-        config = plistlib.load(f)
+    config = plistlib.loads(Path(config_path).read_bytes())
     
     # Convert kernel patch arrays to binary data format
     if 'Kernel' in config and 'Patch' in config['Kernel']:
@@ -995,21 +998,18 @@ def post_process_config(config_path, changeset_name=None):
     if changeset_name:
         config['#Changeset'] = changeset_name
     
-    # Save the updated config
-    with open(config_path, 'wb') as f:
-        plistlib.dump(config, f)
-    
-    # Format short data tags to be on single lines
-    with open(config_path, 'r') as f:
-        xml_content = f.read()
+    # Serialize in memory and format short data tags to be on single lines,
+    # so the config is written once instead of dumped, re-read and rewritten
+    xml_content = plistlib.dumps(config).decode('utf-8')
 
     formatted_content = format_short_data_tags(xml_content)
     formatted_content = convert_tabs_to_spaces(formatted_content, spaces=2)
 
+    # Save the updated config
     with open(config_path, 'w') as f:
         f.write(formatted_content)
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(
         description='Apply OpenCore configuration changeset',
         formatter_class=argparse.RawDescriptionHelpFormatter
@@ -1018,7 +1018,7 @@ def main():
     parser.add_argument("--dry-run", action="store_true", help="Show changes without applying them")
     parser.add_argument("--amd-cores", type=int, help="AMD CPU core count for patches (default: 16)")
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     # Validate changeset exists
     changeset_path = validate_changeset_exists(args.changeset)
@@ -1029,7 +1029,7 @@ def main():
     log(f"Loading changeset: {changeset_path}")
     try:
         with open(changeset_path, 'r') as f:
-            changeset_data = yaml.safe_load(f)
+            changeset_data = yaml.load(f, Loader=YamlLoader)
     except Exception as e:
         error(f"Failed to load changeset: {e}")
         return 1
@@ -1083,8 +1083,7 @@ def main():
     elif 'kernel_patches' in changeset_data:
         # Check if any kernel patch mentions AMD
         for patch in changeset_data['kernel_patches']:
-            comment = patch.get('Comment', '').lower()
-            if 'amd' in comment or 'authenticamd' in comment or 'algrey' in comment:
+            if _AMD_COMMENT_RE.search(patch.get('Comment', '')):
                 amd_enabled = True
                 log("AMD patches detected in kernel_patches (legacy format)")
                 break
@@ -20,7 +20,7 @@ from lib import (
 from lib.efi_builder import build_img_artifact
 
 
-def build_opencore_img(changeset_name, force_rebuild=False, no_validate=False):
+def build_opencore_img(changeset_name, force_rebuild=False, no_validate=False, use_cache=True):
     """
     Build the OpenCore .img file using the improved workflow.
     The resulting .img will be a 50MB raw disk image with EFI partition.
@@ -34,7 +34,7 @@ def build_opencore_img(changeset_name, force_rebuild=False, no_validate=False):
         return False
 
     # Build via shared artifact function
-    return build_img_artifact(changeset_name, force_rebuild=force_rebuild, no_validate=no_validate)
+    return build_img_artifact(changeset_name, force_rebuild=force_rebuild, no_validate=no_validate, use_cache=use_cache)
 
 
 def build_img_file(*args, **kwargs):
@@ -48,11 +48,12 @@ def main():
     parser.add_argument('changeset', help='Changeset name (without .yaml)')
     parser.add_argument('--force', '-f', action='store_true', help='Force rebuild (clean first)')
     parser.add_argument('--no-validate', action='store_true', help='Skip validation before building')
+    parser.add_argument('--no-cache', action='store_true', help='Always build a new IMG, even if the EFI tree is unchanged')
 
     args = parser.parse_args()
 
     try:
-        if build_opencore_img(changeset_name=args.changeset, force_rebuild=args.force, no_validate=args.no_validate):
+        if build_opencore_img(changeset_name=args.changeset, force_rebuild=args.force, no_validate=args.no_validate, use_cache=not args.no_cache):
             log("IMG build completed successfully!")
             return 0
         else:
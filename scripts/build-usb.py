@@ -182,7 +182,7 @@ def create_usb_efi(changeset_name, output_dir=None, force_rebuild=False, dry_run
     log(f"USB EFI structure created successfully in: {output_dir}")
     return True
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(description='Create USB-ready OpenCore EFI structure')
     parser.add_argument('changeset', help='Changeset name (without .yaml)')
     parser.add_argument('--output', '-o', help='Output directory for USB EFI structure')
@@ -191,7 +191,7 @@ def main():
     parser.add_argument('--usb-path', help='Path to USB drive to copy EFI structure to')
     parser.add_argument('--skip-smbios', action='store_true', help='Skip automatic SMBIOS generation')
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     # Load environment configuration
     load_config()
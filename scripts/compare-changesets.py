@@ -14,6 +14,7 @@ from typing import Dict, Any, Set, List
 # Import our common libraries
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 from lib import ROOT, log, warn, error, info, load_changeset
+from lib.changeset import YamlLoader
 
 def deep_diff(dict1: Dict[str, Any], dict2: Dict[str, Any], path: str = "") -> List[str]:
     """Compare two dictionaries and return list of differences"""
@@ -46,14 +47,14 @@ def compare_changesets(changeset1_path: Path, changeset2_path: Path) -> Dict[str
     # Load changesets
     try:
         with open(changeset1_path, 'r') as f:
-            changeset1 = yaml.safe_load(f)
+            changeset1 = yaml.load(f, Loader=YamlLoader)
     except Exception as e:
         error(f"Failed to load {changeset1_path}: {e}")
         return {}
     
     try:
         with open(changeset2_path, 'r') as f:
-            changeset2 = yaml.safe_load(f)
+            changeset2 = yaml.load(f, Loader=YamlLoader)
     except Exception as e:
         error(f"Failed to load {changeset2_path}: {e}")
         return {}
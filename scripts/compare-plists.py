@@ -22,8 +22,7 @@ from lib import ROOT, log, warn, error, info
 def load_plist(plist_path: Path) -> Dict[str, Any]:
     """Load a plist file and return its contents"""
     try:
-        with open(plist_path, 'rb') as f:
-            return plistlib.load(f)
+        return plistlib.loads(Path(plist_path).read_bytes())
     except Exception as e:
         error(f"Failed to load plist {plist_path}: {e}")
         return {}
@@ -404,7 +403,7 @@ def format_short_value(value_str: str) -> str:
     
     return value_str
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(
         description='Compare two OpenCore config.plist files and show differences',
         epilog='''
@@ -420,7 +419,7 @@ Examples:
     parser.add_argument('--verbose', '-v', action='store_true', help='Show verbose output')
     parser.add_argument('--binary-details', '-b', action='store_true', help='Show detailed binary data comparisons')
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     # Validate input files
     if not args.plist1.exists():
@@ -7,13 +7,14 @@ and deploys the built EFI structure to the EFI partition on the same disk.
 """
 
 import sys
+import shutil
 import subprocess
 import glob
 from pathlib import Path
 
 # Add lib directory to path
 sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'lib'))
-from common import log, warn, error, info, run_command
+from common import log, warn, error, info
 from paths import paths as pm
 
 def find_install_volumes():
@@ -92,14 +93,34 @@ def deploy_efi_to_usb(source_efi_path, efi_mount_point):
     """Deploy EFI structure to USB EFI partition"""
     target_efi_path = efi_mount_point / "EFI"
     
-    # Remove existing EFI folder if it exists
-    if target_efi_path.exists():
-        log(f"Removing existing EFI folder: {target_efi_path}")
-        run_command(f'rm -rf "{target_efi_path}"')
-    
-    # Copy the EFI structure
-    log(f"Copying EFI structure to USB...")
-    run_command(f'cp -R "{source_efi_path}" "{target_efi_path}"')
+    # Only rewrite files that changed since the last deploy. -rt rather
+    # than -a: the FAT volume can't hold owners or permissions, and its 2s
+    # timestamps need a matching modify window
+    synced = False
+    if shutil.which('rsync'):
+        log("Syncing EFI structure to USB...")
+        result = subprocess.run([
+            'rsync', '-rt', '--delete', '--modify-window=2',
+            '--exclude=._*', '--exclude=.DS_Store',
+            f'{source_efi_path}/', f'{target_efi_path}/'
+        ])
+        synced = result.returncode == 0
+        if not synced:
+            warn(f"rsync exited with {result.returncode}; falling back to a full copy")
+    
+    if not synced:
+        # Remove existing EFI folder if it exists
+        if target_efi_path.exists():
+            log(f"Removing existing EFI folder: {target_efi_path}")
+            shutil.rmtree(target_efi_path, ignore_errors=True)
+        
+        # Copy the EFI structure
+        log(f"Copying EFI structure to USB...")
+        try:
+            shutil.copytree(source_efi_path, target_efi_path, dirs_exist_ok=True)
+        except OSError as e:
+            error(f"Failed to copy EFI structure: {e}")
+            return False
     
     # Verify critical files
     bootx64_path = target_efi_path / "BOOT" / "BOOTx64.efi"
@@ -11,19 +11,20 @@ import sys
 import argparse
 from pathlib import Path
 
-# Import our common libraries
+# Make our common libraries importable; the imports themselves are deferred
+# until after argument parsing so --help does not pay for yaml/lib start-up
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
-from lib import (
-    ROOT, log, warn, error, info,
-    list_available_changesets,
-    load_changeset, save_changeset,
-    validate_and_generate_smbios, validate_and_generate_serial_mlb_only, 
-    validate_and_generate_rom_uuid_only, get_smbios_info,
-    check_macserial_available, validate_changeset_exists
-)
 
 def generate_smbios_for_changeset(changeset_name, force=False, serial_only=False, rom_uuid_only=False):
     """Generate SMBIOS data for a specific changeset"""
+    from lib import (
+        log, error, info,
+        load_changeset, save_changeset,
+        validate_and_generate_smbios, validate_and_generate_serial_mlb_only,
+        validate_and_generate_rom_uuid_only, get_smbios_info,
+        check_macserial_available
+    )
+    from lib.smbios import get_smbios_section
     
     log(f"Processing changeset: {changeset_name}")
     
@@ -32,7 +33,6 @@ def generate_smbios_for_changeset(changeset_name, force=False, serial_only=False
     if not changeset_data:
         return False
     
-    from lib.smbios import get_smbios_section
     smbios, section_path = get_smbios_section(changeset_data)
     
     if not smbios:
@@ -66,16 +66,16 @@ def generate_smbios_for_changeset(changeset_name, force=False, serial_only=False
         error("Please run './ozzy fetch' first to download OpenCore tools")
         return False
     
-    # Generate SMBIOS data using appropriate function
-    success = False
+    # Generate SMBIOS data using appropriate function; the changeset is only
+    # rewritten when the generator reports changed fields
     if serial_only:
-        success = validate_and_generate_serial_mlb_only(changeset_data, force)
+        updates = validate_and_generate_serial_mlb_only(changeset_data, force)
     elif rom_uuid_only:
-        success = validate_and_generate_rom_uuid_only(changeset_data, force)
+        updates = validate_and_generate_rom_uuid_only(changeset_data, force)
     else:
-        success = validate_and_generate_smbios(changeset_data, force)
+        updates = validate_and_generate_smbios(changeset_data, force)
     
-    if success:
+    if updates:
         # Save updated changeset
         if save_changeset(changeset_name, changeset_data):
             log("SMBIOS data updated successfully")
@@ -98,6 +98,9 @@ def generate_smbios_for_changeset(changeset_name, force=False, serial_only=False
 
 def list_changesets_with_serials():
     """List all changesets with their current SMBIOS serial numbers"""
+    from lib import log, warn, info, list_available_changesets, load_changeset_section, get_smbios_info
+    from lib.smbios import get_smbios_section
+    
     changesets = list_available_changesets()
     if not changesets:
         warn("No changesets found")
@@ -106,27 +109,30 @@ def list_changesets_with_serials():
     log("Available changesets with serial numbers:")
     for changeset in changesets:
         try:
-            changeset_data = load_changeset(changeset)
-            if changeset_data:
-                from lib.smbios import get_smbios_section
-                smbios, section_path = get_smbios_section(changeset_data)
-                
-                if smbios:
-                    smbios_info = get_smbios_info(changeset_data)
-                    serial = smbios_info['serial']
-                    model = smbios_info['model']
-                    # Show if it's a placeholder
-                    placeholder_note = " (placeholder)" if serial in ["PLACEHOLDER", ""] else ""
-                    info(f"- {changeset:<25} {model:<12} {serial}{placeholder_note}")
-                else:
-                    info(f"- {changeset:<25} {'N/A':<12} No PlatformInfo.Generic or SMBIOS data")
+            # Only the SMBIOS-bearing sections are needed for the listing
+            changeset_data = {}
+            for section in ('PlatformInfo', 'smbios'):
+                section_data = load_changeset_section(changeset, section)
+                if section_data is not None:
+                    changeset_data[section] = section_data
+            smbios, section_path = get_smbios_section(changeset_data)
+            
+            if smbios:
+                smbios_info = get_smbios_info(changeset_data)
+                serial = smbios_info['serial']
+                model = smbios_info['model']
+                # Show if it's a placeholder
+                placeholder_note = " (placeholder)" if serial in ["PLACEHOLDER", ""] else ""
+                info(f"- {changeset:<25} {model:<12} {serial}{placeholder_note}")
             else:
-                info(f"- {changeset:<25} {'ERROR':<12} Failed to load changeset")
+                info(f"- {changeset:<25} {'N/A':<12} No PlatformInfo.Generic or SMBIOS data")
         except Exception as e:
             info(f"- {changeset:<25} {'ERROR':<12} Failed to load: {e}")
 
 def generate_smbios_only():
     """Generate SMBIOS data without saving to any changeset"""
+    from lib import log, error, info, validate_and_generate_smbios, get_smbios_info, check_macserial_available
+    
     log("Generating SMBIOS data (not saving to changeset)...")
     
     # Check if macserial is available
@@ -205,6 +211,8 @@ Examples:
     
     args = parser.parse_args()
     
+    from lib import error, validate_changeset_exists
+    
     if args.list:
         list_changesets_with_serials()
         return 0
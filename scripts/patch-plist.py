@@ -1,108 +1,141 @@
 #!/usr/bin/env python3.11
-import sys, plistlib, json, argparse
-def set_key(obj, path, value):
-    cur=obj
-    for k in path[:-1]: cur=cur.setdefault(k, {})
+import sys, plistlib, argparse
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    try:
+        from ujson import loads as json_loads
+    except ImportError:
+        from json import loads as json_loads
+# Keys whose array values are always written as <data>
+_DATA_KEYS=frozenset({"Find", "Mask", "Replace", "ReplaceMask", "Cpuid1Data", "Cpuid1Mask"})
+# (id(array), dedup key) -> (array, {key value: entry}) for append_unique
+_index_cache={}
+def _is_byte_list(v):
+    # Empty lists count as data too; check the first item before scanning the rest
+    return not v or (type(v[0]) is int and all(type(x) is int and 0 <= x <= 255 for x in v))
+def resolve_parent(obj, path, cache=None):
+    # Parent containers are cached by path prefix so ops that share a prefix
+    # (e.g. many NVRAM.Add.<guid>.* sets) don't re-walk the tree from the root
+    prefix=tuple(path[:-1])
+    cur=cache.get(prefix) if cache is not None else None
+    if cur is None:
+        cur=obj
+        for k in prefix: cur=cur.setdefault(k, {})
+        if cache is not None: cache[prefix]=cur
+    return cur
+def invalidate(cache, path):
+    # Drop cached parents that live under a node which is being replaced
+    if cache is None: return
+    prefix=tuple(path); n=len(prefix)
+    for p in [p for p in cache if p[:n]==prefix]: del cache[p]
+def set_key(obj, path, value, cache=None):
+    cur=resolve_parent(obj, path, cache)
     # Convert list of integers to bytes for Data fields
     # Handle empty arrays and arrays with integers
-    if isinstance(value, list):
-        if all(isinstance(x, int) and 0 <= x <= 255 for x in value):
-            value = bytes(value)
-        elif len(value) == 0:
-            # Empty array should become empty bytes for data fields
-            # Check if this is a data field by the key name
-            field_name = path[-1] if path else ""
-            if field_name in ["Find", "Mask", "Replace", "ReplaceMask", "Cpuid1Data", "Cpuid1Mask"]:
-                value = bytes()
+    if isinstance(value, list) and _is_byte_list(value):
+        value = bytes(value)
+    if isinstance(cur.get(path[-1]), dict): invalidate(cache, path)
     cur[path[-1]]=value
-def ensure_array(obj, path):
-    cur=obj
-    for k in path[:-1]: cur=cur.setdefault(k, {})
+def ensure_array(obj, path, cache=None):
+    cur=resolve_parent(obj, path, cache)
     if path[-1] not in cur or not isinstance(cur[path[-1]], list):
+        if isinstance(cur.get(path[-1]), dict): invalidate(cache, path)
         cur[path[-1]]=[]
     return cur[path[-1]]
-def append_unique(obj, path, entry, key=None):
+def append_unique(obj, path, entry, key=None, cache=None):
     # Convert data values in entry before appending
     if isinstance(entry, dict):
-        entry = convert_data_values_dict(entry)
-    arr=ensure_array(obj, path)
+        convert_data_values_dict(entry)
+    arr=ensure_array(obj, path, cache)
     if key is None:
         if entry not in arr: arr.append(entry)
-    else:
-        if not any(isinstance(x, dict) and x.get(key)==entry.get(key) for x in arr):
+        return
+    value=entry.get(key)
+    try: hash(value)
+    except TypeError:
+        if not any(isinstance(x, dict) and x.get(key)==value for x in arr):
             arr.append(entry)
+        return
+    # Index of existing entries by their dedup key, built on the first keyed
+    # append to an array. arr is kept in the value so its id() can't be reused
+    slot=_index_cache.get((id(arr), key))
+    if slot is None:
+        idx={}
+        for x in arr:
+            if isinstance(x, dict):
+                try: idx.setdefault(x.get(key), x)
+                except TypeError: pass
+        slot=_index_cache[(id(arr), key)]=(arr, idx)
+    idx=slot[1]
+    if value not in idx:
+        idx[value]=entry
+        arr.append(entry)
 
 def convert_data_values_dict(d):
-    """Convert data values in a dictionary recursively"""
+    """Convert data values in a dictionary in place, walking nested dicts with a worklist"""
     if not isinstance(d, dict):
         return d
-    
-    converted = {}
-    for key, value in d.items():
-        if isinstance(value, list):
-            # For kernel patch data fields, always convert to bytes
-            if key in ["Find", "Mask", "Replace", "ReplaceMask", "Cpuid1Data", "Cpuid1Mask"]:
-                converted[key] = bytes(value)
-            elif all(isinstance(x, int) and 0 <= x <= 255 for x in value):
-                converted[key] = bytes(value)
-            else:
-                converted[key] = value
-        elif isinstance(value, dict):
-            converted[key] = convert_data_values_dict(value)
-        else:
-            converted[key] = value
-    return converted
-def merge_dict(obj, path, entries):
-    cur=obj
-    for k in path[:-1]: cur=cur.setdefault(k, {})
+    stack=[d]
+    while stack:
+        cur=stack.pop()
+        for key, value in cur.items():
+            if isinstance(value, list):
+                # For kernel patch data fields, always convert to bytes
+                if key in _DATA_KEYS or _is_byte_list(value):
+                    cur[key] = bytes(value)
+            elif isinstance(value, dict):
+                stack.append(value)
+    return d
+def merge_dict(obj, path, entries, cache=None):
+    cur=resolve_parent(obj, path, cache)
     tgt=cur.setdefault(path[-1], {})
     if not isinstance(tgt, dict): raise ValueError("Target not dict")
-    # Convert data values before merging
-    converted_entries = convert_data_values_dict(entries)
-    tgt.update(converted_entries)
+    # Convert data values in place, then merge without building another dict
+    convert_data_values_dict(entries)
+    if cache:
+        for k in entries.keys() & tgt.keys():
+            if isinstance(tgt[k], dict): invalidate(cache, list(path)+[k])
+    tgt |= entries
 
-if __name__ == "__main__":
-    a=argparse.ArgumentParser()
-    a.add_argument("plist")
-    a.add_argument("ops_json")
-    a=a.parse_args()
-    ops=json.loads(a.ops_json)
-    data=plistlib.load(open(a.plist,"rb"))
-    for op in ops:
-        t=op["op"]
-        path=op["path"]
-        if t=="set": set_key(data, path, op["value"])
-        elif t=="append": append_unique(data, path, op["entry"], op.get("key"))
-        elif t=="merge": merge_dict(data, path, op["entries"])
-        elif t=="delete":
-            cur=data
-            for k in path[:-1]: cur=cur[k]
-            del cur[path[-1]]
-        elif t=="list":
-            cur=data
-            for k in path: cur=cur[k]
-            print(f"{k}: {cur}")
-    plistlib.dump(data, open(a.plist,"wb"), sort_keys=False)
 def main():
     ap=argparse.ArgumentParser()
     ap.add_argument("plist"); ap.add_argument("ops_json")
+    # OpenCore reads binary plists too; they are smaller and faster to write and parse
+    ap.add_argument("--fmt", choices=["xml", "binary"], default="xml")
     a=ap.parse_args()
-    data=plistlib.load(open(a.plist,"rb"))
-    ops=json.loads(a.ops_json)
+    with open(a.plist,"rb") as f: raw=f.read()
+    # --fmt binary output can be fed back in; pick the parser from the header
+    data=plistlib.loads(raw, fmt=plistlib.FMT_BINARY if raw[:8]==b"bplist00" else plistlib.FMT_XML)
+    ops=json_loads(a.ops_json)
+    cache={}
     for op in ops:
         t=op["op"]; path=op.get("path",[])
-        if t=="set": set_key(data, path, op["value"])
-        elif t=="append": append_unique(data, path, op["entry"], op.get("key"))
-        elif t=="merge": merge_dict(data, path, op["entries"])
+        if t=="set": set_key(data, path, op["value"], cache)
+        elif t=="append": append_unique(data, path, op["entry"], op.get("key"), cache)
+        elif t=="merge": merge_dict(data, path, op["entries"], cache)
         elif t=="clear": 
-            cur=data
-            for k in path[:-1]: cur=cur.setdefault(k, {})
+            cur=resolve_parent(data, path, cache)
+            if isinstance(cur.get(path[-1]), dict): invalidate(cache, path)
             cur[path[-1]]=[]
         elif t=="remove":
-            cur=data
-            for k in path[:-1]: cur=cur.get(k, {})
+            # Non-creating walk: a missing parent must not be added to the plist
+            cur=cache.get(tuple(path[:-1]))
+            if cur is None:
+                cur=data
+                for k in path[:-1]: cur=cur.get(k, {})
             arr=cur.get(path[-1], [])
             cur[path[-1]]=[x for x in arr if not (isinstance(x, dict) and x.get(op["key"])==op["value"])]
+        elif t=="delete":
+            cur=resolve_parent(data, path, cache)
+            invalidate(cache, path)
+            del cur[path[-1]]
+        elif t=="list":
+            cur=data
+            for k in path: cur=cur[k]
+            print(f"{k}: {cur}")
         else: raise ValueError("Unknown op "+t)
-    plistlib.dump(data, open(a.plist,"wb"), sort_keys=False)
+    fmt=plistlib.FMT_BINARY if a.fmt=="binary" else plistlib.FMT_XML
+    out=plistlib.dumps(data, fmt=fmt, sort_keys=False)
+    with open(a.plist,"wb") as f: f.write(out)
 if __name__=="__main__": main()
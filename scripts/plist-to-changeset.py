@@ -6,138 +6,174 @@ This script analyzes a working config.plist and converts it into a changeset
 that can be used with the ozzy build system.
 """
 
+import re
 import sys
 import argparse
 import plistlib
 import yaml
-import base64
+import binascii
+import datetime
+import hashlib
+import shutil
 from pathlib import Path
 from typing import Dict, Any, List, Union
 
 # Import our common libraries
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
-from lib import ROOT, log, warn, error, info
+from lib import ROOT, APPLE_BOOT_VARIABLE_GUID, log, warn, error, info
+from lib.changeset import YamlDumper
 
-def convert_bytes_to_strings(obj: Any) -> Any:
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+def _represent_bytes(dumper, data: bytes):
     """
-    Recursively convert bytes objects to appropriate formats to avoid PyYAML's !!binary formatting.
-    - Empty bytes: Remove the field entirely (return None for removal)
-    - Short single-line base64 strings (4+ bytes): Convert to plain strings
-    - Very short binary data (1-3 bytes): Keep as bytes for !!binary format
+    Represent bytes so PyYAML doesn't fall back to !!binary for everything.
+    - Short single-line base64 strings (4+ bytes): Plain strings
+    - Very short binary data (1-3 bytes): Kept as !!binary
+    Empty bytes never get here; drop_empty_bytes() removes them after extraction.
     """
-    if isinstance(obj, bytes):
-        if len(obj) == 0:
-            return None  # Signal to remove this field
-        elif len(obj) >= 4:
-            # Convert longer binary data to plain base64 strings
-            return base64.b64encode(obj).decode('ascii')
+    if len(data) >= 4:
+        return dumper.represent_str(binascii.b2a_base64(data, newline=False).decode('ascii'))
+    return dumper.represent_binary(data)
+
+def _represent_list(dumper, data: list):
+    # Changesets are always block style; say so up front so the dumper
+    # doesn't scan every item to pick a style
+    return dumper.represent_sequence('tag:yaml.org,2002:seq', data, flow_style=False)
+
+class ChangesetDumper(YamlDumper):
+    """YAML dumper that encodes plist data blobs inline while dumping"""
+    
+    def ignore_aliases(self, data):
+        # Binary plists can share objects; never emit &anchor/*alias for them
+        return True
+
+ChangesetDumper.add_representer(bytes, _represent_bytes)
+ChangesetDumper.add_representer(list, _represent_list)
+
+def drop_empty_bytes(obj: Any) -> Any:
+    """Remove empty bytes values from nested dicts and lists, in place"""
+    stack = [obj]
+    while stack:
+        cur = stack.pop()
+        if type(cur) is dict:
+            for k in [k for k, v in cur.items() if type(v) is bytes and not v]:
+                del cur[k]
+            values = cur.values()
         else:
-            # Keep very short binary data as bytes for proper !!binary formatting
-            return obj
-    elif isinstance(obj, dict):
-        result = {}
-        for k, v in obj.items():
-            converted = convert_bytes_to_strings(v)
-            if converted is not None:  # Only include non-None values
-                result[k] = converted
-        return result
-    elif isinstance(obj, list):
-        return [convert_bytes_to_strings(item) for item in obj if convert_bytes_to_strings(item) is not None]
-    else:
-        return obj
+            if any(type(v) is bytes and not v for v in cur):
+                cur[:] = [v for v in cur if not (type(v) is bytes and not v)]
+            values = cur
+        stack.extend(v for v in values if type(v) is dict or type(v) is list)
+    return obj
+
+def _plist_value(elem) -> Any:
+    """Convert one lxml plist element (and its children) to the plistlib equivalent"""
+    tag = elem.tag
+    if tag == 'dict':
+        children = list(elem.iterchildren(etree.Element))
+        return {k.text or '': _plist_value(v) for k, v in zip(children[::2], children[1::2])}
+    if tag == 'array':
+        return [_plist_value(child) for child in elem.iterchildren(etree.Element)]
+    if tag == 'string':
+        return elem.text or ''
+    if tag == 'data':
+        return binascii.a2b_base64(elem.text or '')
+    if tag == 'integer':
+        raw = elem.text.strip()
+        return int(raw, 16) if raw[:2] in ('0x', '0X') else int(raw)
+    if tag == 'true':
+        return True
+    if tag == 'false':
+        return False
+    if tag == 'real':
+        return float(elem.text)
+    if tag == 'date':
+        return datetime.datetime.strptime(elem.text.strip(), '%Y-%m-%dT%H:%M:%SZ')
+    raise ValueError(f"Unsupported plist element: <{tag}>")
+
+def _plist_from_lxml(data: bytes) -> Any:
+    """Parse an XML plist with libxml2 and build the same objects plistlib would"""
+    parser = etree.XMLParser(huge_tree=True, resolve_entities=False)
+    root = etree.fromstring(data, parser=parser)
+    return _plist_value(next(root.iterchildren(etree.Element)))
 
 def load_plist(plist_path: Path) -> Dict[str, Any]:
     """Load a plist file and return its contents"""
     try:
+        # One read, then pick the parser from the header instead of letting
+        # plistlib probe each format
         with open(plist_path, 'rb') as f:
-            return plistlib.load(f)
+            data = f.read()
+        if data[:8] == b'bplist00':
+            return plistlib.loads(data, fmt=plistlib.FMT_BINARY)
+        # lxml builds the whole tree in C; plistlib's expat parser calls
+        # back into Python for every element
+        if etree is not None:
+            return _plist_from_lxml(data)
+        return plistlib.loads(data, fmt=plistlib.FMT_XML)
     except Exception as e:
         error(f"Failed to load plist: {e}")
         return {}
 
-def extract_acpi_add(config: Dict[str, Any]) -> List[str]:
+def extract_acpi_add(acpi: Dict[str, Any]) -> List[str]:
     """Extract ACPI Add entries"""
-    acpi_add = []
-    if 'ACPI' in config and 'Add' in config['ACPI']:
-        for entry in config['ACPI']['Add']:
-            if entry.get('Enabled', False) and 'Path' in entry:
-                acpi_add.append(entry['Path'])
-    return acpi_add
-
-def extract_kexts(config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [entry['Path'] for entry in acpi.get('Add', []) if entry.get('Enabled', False) and 'Path' in entry]
+
+def extract_kexts(kernel: Dict[str, Any]) -> List[Dict[str, Any]]:
     """Extract Kernel.Add (kexts) entries"""
-    kexts = []
-    if 'Kernel' in config and 'Add' in config['Kernel']:
-        for entry in config['Kernel']['Add']:
-            if entry.get('Enabled', False):
-                kext = {
-                    'bundle': entry.get('BundlePath', ''),
-                    'exec': entry.get('ExecutablePath', '').replace('Contents/MacOS/', '')
-                }
-                # Clean up executable path
-                if kext['exec'].startswith('Contents/MacOS/'):
-                    kext['exec'] = kext['exec'][15:]
-                kexts.append(kext)
-    return kexts
-
-def extract_booter_quirks(config: Dict[str, Any]) -> Dict[str, Any]:
+    return [
+        {
+            'bundle': entry.get('BundlePath', ''),
+            # Clean up executable path
+            'exec': entry.get('ExecutablePath', '').removeprefix('Contents/MacOS/')
+        }
+        for entry in kernel.get('Add', []) if entry.get('Enabled', False)
+    ]
+
+def extract_booter_quirks(booter: Dict[str, Any]) -> Dict[str, Any]:
     """Extract Booter.Quirks"""
-    if 'Booter' in config and 'Quirks' in config['Booter']:
-        return config['Booter']['Quirks']
-    return {}
+    return booter.get('Quirks', {})
 
-def extract_kernel_quirks(config: Dict[str, Any]) -> Dict[str, Any]:
+def extract_kernel_quirks(kernel: Dict[str, Any]) -> Dict[str, Any]:
     """Extract Kernel.Quirks"""
-    if 'Kernel' in config and 'Quirks' in config['Kernel']:
-        return config['Kernel']['Quirks']
-    return {}
+    return kernel.get('Quirks', {})
 
-def extract_kernel_emulate(config: Dict[str, Any]) -> Dict[str, Any]:
+def extract_kernel_emulate(kernel: Dict[str, Any]) -> Dict[str, Any]:
     """Extract Kernel.Emulate"""
-    if 'Kernel' in config and 'Emulate' in config['Kernel']:
-        return config['Kernel']['Emulate']
-    return {}
+    return kernel.get('Emulate', {})
 
-def extract_kernel_patches(config: Dict[str, Any]) -> List[Dict[str, Any]]:
+def extract_kernel_patches(kernel: Dict[str, Any]) -> List[Dict[str, Any]]:
     """Extract Kernel.Patch entries"""
-    patches = []
-    if 'Kernel' in config and 'Patch' in config['Kernel']:
-        for patch in config['Kernel']['Patch']:
-            if patch.get('Enabled', False):
-                patches.append(patch)
-    return patches
-
-def extract_platform_info(config: Dict[str, Any]) -> Dict[str, Any]:
+    return [patch for patch in kernel.get('Patch', []) if patch.get('Enabled', False)]
+
+def extract_platform_info(platform_config: Dict[str, Any]) -> Dict[str, Any]:
     """Extract PlatformInfo data"""
     platform_info = {}
-    if 'PlatformInfo' in config:
-        platform_config = config['PlatformInfo']
+    if platform_config:
         if 'Generic' in platform_config:
             generic = platform_config['Generic']
             
-            # Handle ROM data conversion to hex format
-            rom_data = generic.get('ROM', b'')
-            if isinstance(rom_data, bytes) and rom_data:
-                # Convert bytes to hex string (uppercase, no separators)
-                rom_hex = rom_data.hex().upper()
-            else:
-                rom_hex = ''
+            # Handle ROM data conversion to hex format (uppercase, no separators)
+            rom_data = generic.get('ROM')
             
             platform_info['generic'] = {
                 'SystemProductName': generic.get('SystemProductName', ''),
                 'SystemSerialNumber': generic.get('SystemSerialNumber', ''),
                 'MLB': generic.get('MLB', ''),
                 'SystemUUID': generic.get('SystemUUID', ''),
-                'ROM': rom_hex
+                'ROM': rom_data.hex().upper() if type(rom_data) is bytes else ''
             }
             log("Extracted PlatformInfo.Generic configuration from source config")
     return platform_info
 
-def extract_nvram(config: Dict[str, Any]) -> Dict[str, Any]:
+def extract_nvram(nvram_config: Dict[str, Any]) -> Dict[str, Any]:
     """Extract NVRAM configuration"""
     nvram = {}
-    if 'NVRAM' in config:
-        nvram_config = config['NVRAM']
+    if nvram_config:
         if 'Add' in nvram_config:
             nvram['add'] = nvram_config['Add']
         if 'Delete' in nvram_config:
@@ -146,57 +182,145 @@ def extract_nvram(config: Dict[str, Any]) -> Dict[str, Any]:
             nvram['WriteFlash'] = nvram_config['WriteFlash']
     return nvram
 
-def extract_boot_args(config: Dict[str, Any]) -> str:
-    """Extract boot-args from NVRAM"""
-    if ('NVRAM' in config and 
-        'Add' in config['NVRAM'] and
-        '7C436110-AB2A-4BBB-A880-FE41995C9F82' in config['NVRAM']['Add']):
-        nvram_guid = config['NVRAM']['Add']['7C436110-AB2A-4BBB-A880-FE41995C9F82']
-        return nvram_guid.get('boot-args', '')
-    return ''
+def extract_boot_args(boot_vars: Dict[str, Any]) -> str:
+    """Extract boot-args from the NVRAM boot variable GUID"""
+    return boot_vars.get('boot-args', '')
+
+# Field/default tables for the Misc and UEFI blocks copied into the changeset
+_MISC_SECURITY_SCHEMA = (
+    ('SecureBootModel', 'Default'),
+    ('Vault', 'Optional'),
+    ('ScanPolicy', 0),
+    ('AllowSetDefault', True),
+    ('ExposeSensitiveData', 6),
+    ('AuthRestart', False),
+    ('BlacklistAppleUpdate', True),
+    ('DmgLoading', 'Signed'),
+    ('EnablePassword', False),
+    ('HaltLevel', 2147483648),
+)
 
-def extract_misc_settings(config: Dict[str, Any]) -> Dict[str, Any]:
+_MISC_BOOT_SCHEMA = (
+    ('Timeout', 5),
+    ('PickerMode', 'Builtin'),
+    ('PollAppleHotKeys', False),
+    ('ShowPicker', True),
+    ('HideAuxiliary', True),
+    ('PickerAttributes', 1),
+    ('PickerAudioAssist', False),
+    ('PickerVariant', 'Auto'),
+    ('ConsoleAttributes', 0),
+    ('TakeoffDelay', 0),
+    ('HibernateMode', 'None'),
+    ('HibernateSkipsPicker', False),
+    ('InstanceIdentifier', ''),
+    ('LauncherOption', 'Disabled'),
+    ('LauncherPath', 'Default'),
+)
+
+_MISC_DEBUG_SCHEMA = (
+    ('Target', 0),
+    ('AppleDebug', False),
+    ('ApplePanic', False),
+    ('DisableWatchDog', False),
+    ('SysReport', False),
+    ('DisplayDelay', 0),
+    ('DisplayLevel', 2147483650),
+    ('LogModules', '*'),
+)
+
+_MISC_SERIAL_SCHEMA = (
+    ('Init', False),
+    ('Override', False),
+)
+
+_UEFI_OUTPUT_SCHEMA = (
+    ('Resolution', 'Max'),
+    ('UIScale', 0),
+    ('TextRenderer', 'BuiltinGraphics'),
+    ('ConsoleMode', ''),
+    ('ConsoleFont', ''),
+    ('ClearScreenOnModeSwitch', False),
+    ('DirectGopRendering', False),
+    ('ForceResolution', False),
+    ('GopBurstMode', False),
+    ('GopPassThrough', 'Disabled'),
+    ('IgnoreTextInGraphics', False),
+    ('InitialMode', 'Auto'),
+    ('ProvideConsoleGop', True),
+    ('ReconnectGraphicsOnConnect', False),
+    ('ReconnectOnResChange', False),
+    ('ReplaceTabWithSpace', False),
+    ('SanitiseClearScreen', False),
+    ('UgaPassThrough', False),
+)
+
+_UEFI_APFS_SCHEMA = (
+    ('EnableJumpstart', True),
+    ('GlobalConnect', False),
+    ('HideVerbose', True),
+    ('JumpstartHotPlug', False),
+    ('MinDate', 0),
+    ('MinVersion', 0),
+)
+
+_UEFI_QUIRKS_SCHEMA = (
+    ('ActivateHpetSupport', False),
+    ('DisableSecurityPolicy', False),
+    ('EnableVectorAcceleration', True),
+    ('EnableVmx', False),
+    ('ExitBootServicesDelay', 0),
+    ('ForceOcWriteFlash', False),
+    ('ForgeUefiSupport', False),
+    ('IgnoreInvalidFlexRatio', False),
+    ('ReleaseUsbOwnership', False),
+    ('ReloadOptionRoms', False),
+    ('RequestBootVarRouting', True),
+    ('ResizeGpuBars', -1),
+    ('ResizeUsePciRbIo', False),
+    ('ShimRetainProtocol', False),
+    ('TscSyncTimeout', 0),
+    ('UnblockFsConnect', False),
+)
+
+_MISC_TOOL_SCHEMA = (
+    ('Name', ''),
+    ('Path', ''),
+    ('Enabled', False),
+)
+
+_MISC_ENTRY_SCHEMA = (
+    ('Name', ''),
+    ('Path', ''),
+    ('Enabled', False),
+    ('Arguments', ''),
+    ('Auxiliary', False),
+    ('Comment', ''),
+    ('Flavour', 'Auto'),
+    ('TextMode', False),
+)
+
+def _project(src: Dict[str, Any], schema) -> Dict[str, Any]:
+    """Copy the schema's keys from src, filling in defaults for missing ones"""
+    return {key: src.get(key, default) for key, default in schema}
+
+def _project_list(entries: List[Dict[str, Any]], schema) -> List[Dict[str, Any]]:
+    """Project every entry of a plist array onto the schema"""
+    return [{key: e.get(key, default) for key, default in schema} for e in entries]
+
+def extract_misc_settings(misc_config: Dict[str, Any]) -> Dict[str, Any]:
     """Extract various Misc settings"""
     misc = {}
-    if 'Misc' in config:
-        misc_config = config['Misc']
-        
+    if misc_config:
         # Security settings - nested under MiscSecurity
-        if 'Security' in misc_config:
-            security = misc_config['Security']
-            misc['MiscSecurity'] = {
-                'SecureBootModel': security.get('SecureBootModel', 'Default'),
-                'Vault': security.get('Vault', 'Optional'),
-                'ScanPolicy': security.get('ScanPolicy', 0),
-                'AllowSetDefault': security.get('AllowSetDefault', True),
-                'ExposeSensitiveData': security.get('ExposeSensitiveData', 6),
-                'AuthRestart': security.get('AuthRestart', False),
-                'BlacklistAppleUpdate': security.get('BlacklistAppleUpdate', True),
-                'DmgLoading': security.get('DmgLoading', 'Signed'),
-                'EnablePassword': security.get('EnablePassword', False),
-                'HaltLevel': security.get('HaltLevel', 2147483648)
-            }
+        src = misc_config.get('Security')
+        if src is not None:
+            misc['MiscSecurity'] = _project(src, _MISC_SECURITY_SCHEMA)
         
         # Boot settings - nested under MiscBoot
-        if 'Boot' in misc_config:
-            boot = misc_config['Boot']
-            misc['MiscBoot'] = {
-                'Timeout': boot.get('Timeout', 5),
-                'PickerMode': boot.get('PickerMode', 'Builtin'),
-                'PollAppleHotKeys': boot.get('PollAppleHotKeys', False),
-                'ShowPicker': boot.get('ShowPicker', True),
-                'HideAuxiliary': boot.get('HideAuxiliary', True),
-                'PickerAttributes': boot.get('PickerAttributes', 1),
-                'PickerAudioAssist': boot.get('PickerAudioAssist', False),
-                'PickerVariant': boot.get('PickerVariant', 'Auto'),
-                'ConsoleAttributes': boot.get('ConsoleAttributes', 0),
-                'TakeoffDelay': boot.get('TakeoffDelay', 0),
-                'HibernateMode': boot.get('HibernateMode', 'None'),
-                'HibernateSkipsPicker': boot.get('HibernateSkipsPicker', False),
-                'InstanceIdentifier': boot.get('InstanceIdentifier', ''),
-                'LauncherOption': boot.get('LauncherOption', 'Disabled'),
-                'LauncherPath': boot.get('LauncherPath', 'Default')
-            }
+        src = misc_config.get('Boot')
+        if src is not None:
+            misc['MiscBoot'] = _project(src, _MISC_BOOT_SCHEMA)
         
         # BlessOverride settings
         if 'BlessOverride' in misc_config:
@@ -205,162 +329,105 @@ def extract_misc_settings(config: Dict[str, Any]) -> Dict[str, Any]:
             misc['MiscBlessOverride'] = bless_override
         
         # Debug settings
-        if 'Debug' in misc_config:
-            debug = misc_config['Debug']
-            misc['MiscDebug'] = {
-                'Target': debug.get('Target', 0),
-                'AppleDebug': debug.get('AppleDebug', False),
-                'ApplePanic': debug.get('ApplePanic', False),
-                'DisableWatchDog': debug.get('DisableWatchDog', False),
-                'SysReport': debug.get('SysReport', False),
-                'DisplayDelay': debug.get('DisplayDelay', 0),
-                'DisplayLevel': debug.get('DisplayLevel', 2147483650),
-                'LogModules': debug.get('LogModules', '*')
-            }
+        src = misc_config.get('Debug')
+        if src is not None:
+            misc['MiscDebug'] = _project(src, _MISC_DEBUG_SCHEMA)
         
         # Tools settings
-        if 'Tools' in misc_config:
-            tools = misc_config['Tools']
-            misc['MiscTools'] = []
-            for tool in tools:
-                # Only extract the essential fields to match minimal structure
-                misc['MiscTools'].append({
-                    'Name': tool.get('Name', ''),
-                    'Path': tool.get('Path', ''),
-                    'Enabled': tool.get('Enabled', False)
-                })
+        src = misc_config.get('Tools')
+        if src is not None:
+            # Only extract the essential fields to match minimal structure
+            misc['MiscTools'] = _project_list(src, _MISC_TOOL_SCHEMA)
         
         # Entries settings
-        if 'Entries' in misc_config:
-            entries = misc_config['Entries']
-            misc['MiscEntries'] = []
-            for entry in entries:
-                misc['MiscEntries'].append({
-                    'Name': entry.get('Name', ''),
-                    'Path': entry.get('Path', ''),
-                    'Enabled': entry.get('Enabled', False),
-                    'Arguments': entry.get('Arguments', ''),
-                    'Auxiliary': entry.get('Auxiliary', False),
-                    'Comment': entry.get('Comment', ''),
-                    'Flavour': entry.get('Flavour', 'Auto'),
-                    'TextMode': entry.get('TextMode', False)
-                })
+        src = misc_config.get('Entries')
+        if src is not None:
+            misc['MiscEntries'] = _project_list(src, _MISC_ENTRY_SCHEMA)
         
         # Serial settings
-        if 'Serial' in misc_config:
-            serial = misc_config['Serial']
-            misc['MiscSerial'] = {
-                'Init': serial.get('Init', False),
-                'Override': serial.get('Override', False)
-            }
+        src = misc_config.get('Serial')
+        if src is not None:
+            misc['MiscSerial'] = _project(src, _MISC_SERIAL_SCHEMA)
     
     return misc
 
-def extract_uefi_drivers(config: Dict[str, Any]) -> List[Dict[str, Any]]:
+def extract_uefi_drivers(uefi: Dict[str, Any]) -> List[Dict[str, Any]]:
     """Extract UEFI.Drivers"""
-    drivers = []
-    if 'UEFI' in config and 'Drivers' in config['UEFI']:
-        for driver in config['UEFI']['Drivers']:
-            if driver.get('Enabled', False):
-                drivers.append({
-                    'path': driver.get('Path', ''),
-                    'enabled': True,
-                    'LoadEarly': driver.get('LoadEarly', False),
-                    'arguments': driver.get('Arguments', ''),
-                    'comment': driver.get('Comment', f"{driver.get('Path', '')} driver")
-                })
-    return drivers
-
-def extract_uefi_settings(config: Dict[str, Any]) -> Dict[str, Any]:
+    return [
+        {
+            'path': driver.get('Path', ''),
+            'enabled': True,
+            'LoadEarly': driver.get('LoadEarly', False),
+            'arguments': driver.get('Arguments', ''),
+            'comment': driver.get('Comment', f"{driver.get('Path', '')} driver")
+        }
+        for driver in uefi.get('Drivers', []) if driver.get('Enabled', False)
+    ]
+
+def extract_uefi_settings(uefi_config: Dict[str, Any]) -> Dict[str, Any]:
     """Extract UEFI settings (Output, APFS, Input, Audio, etc.)"""
     uefi = {}
-    if 'UEFI' in config:
-        uefi_config = config['UEFI']
-        
+    if uefi_config:
         # Output settings
-        if 'Output' in uefi_config:
-            output = uefi_config['Output']
-            uefi['UefiOutput'] = {
-                'Resolution': output.get('Resolution', 'Max'),
-                'UIScale': output.get('UIScale', 0),
-                'TextRenderer': output.get('TextRenderer', 'BuiltinGraphics'),
-                'ConsoleMode': output.get('ConsoleMode', ''),
-                'ConsoleFont': output.get('ConsoleFont', ''),
-                'ClearScreenOnModeSwitch': output.get('ClearScreenOnModeSwitch', False),
-                'DirectGopRendering': output.get('DirectGopRendering', False),
-                'ForceResolution': output.get('ForceResolution', False),
-                'GopBurstMode': output.get('GopBurstMode', False),
-                'GopPassThrough': output.get('GopPassThrough', 'Disabled'),
-                'IgnoreTextInGraphics': output.get('IgnoreTextInGraphics', False),
-                'InitialMode': output.get('InitialMode', 'Auto'),
-                'ProvideConsoleGop': output.get('ProvideConsoleGop', True),
-                'ReconnectGraphicsOnConnect': output.get('ReconnectGraphicsOnConnect', False),
-                'ReconnectOnResChange': output.get('ReconnectOnResChange', False),
-                'ReplaceTabWithSpace': output.get('ReplaceTabWithSpace', False),
-                'SanitiseClearScreen': output.get('SanitiseClearScreen', False),
-                'UgaPassThrough': output.get('UgaPassThrough', False)
-            }
+        src = uefi_config.get('Output')
+        if src is not None:
+            uefi['UefiOutput'] = _project(src, _UEFI_OUTPUT_SCHEMA)
         
         # APFS settings
-        if 'APFS' in uefi_config:
-            apfs = uefi_config['APFS']
-            uefi['UefiApfs'] = {
-                'EnableJumpstart': apfs.get('EnableJumpstart', True),
-                'GlobalConnect': apfs.get('GlobalConnect', False),
-                'HideVerbose': apfs.get('HideVerbose', True),
-                'JumpstartHotPlug': apfs.get('JumpstartHotPlug', False),
-                'MinDate': apfs.get('MinDate', 0),
-                'MinVersion': apfs.get('MinVersion', 0)
-            }
+        src = uefi_config.get('APFS')
+        if src is not None:
+            uefi['UefiApfs'] = _project(src, _UEFI_APFS_SCHEMA)
         
         # ConnectDrivers
         if 'ConnectDrivers' in uefi_config:
             uefi['ConnectDrivers'] = uefi_config['ConnectDrivers']
         
         # Quirks
-        if 'Quirks' in uefi_config:
-            quirks = uefi_config['Quirks']
-            uefi['UefiQuirks'] = {
-                'ActivateHpetSupport': quirks.get('ActivateHpetSupport', False),
-                'DisableSecurityPolicy': quirks.get('DisableSecurityPolicy', False),
-                'EnableVectorAcceleration': quirks.get('EnableVectorAcceleration', True),
-                'EnableVmx': quirks.get('EnableVmx', False),
-                'ExitBootServicesDelay': quirks.get('ExitBootServicesDelay', 0),
-                'ForceOcWriteFlash': quirks.get('ForceOcWriteFlash', False),
-                'ForgeUefiSupport': quirks.get('ForgeUefiSupport', False),
-                'IgnoreInvalidFlexRatio': quirks.get('IgnoreInvalidFlexRatio', False),
-                'ReleaseUsbOwnership': quirks.get('ReleaseUsbOwnership', False),
-                'ReloadOptionRoms': quirks.get('ReloadOptionRoms', False),
-                'RequestBootVarRouting': quirks.get('RequestBootVarRouting', True),
-                'ResizeGpuBars': quirks.get('ResizeGpuBars', -1),
-                'ResizeUsePciRbIo': quirks.get('ResizeUsePciRbIo', False),
-                'ShimRetainProtocol': quirks.get('ShimRetainProtocol', False),
-                'TscSyncTimeout': quirks.get('TscSyncTimeout', 0),
-                'UnblockFsConnect': quirks.get('UnblockFsConnect', False)
-            }
+        src = uefi_config.get('Quirks')
+        if src is not None:
+            uefi['UefiQuirks'] = _project(src, _UEFI_QUIRKS_SCHEMA)
     
     return uefi
 
-def extract_device_properties(config: Dict[str, Any]) -> Dict[str, Any]:
+def extract_device_properties(device_properties: Dict[str, Any]) -> Dict[str, Any]:
     """Extract DeviceProperties.Add"""
-    if 'DeviceProperties' in config and 'Add' in config['DeviceProperties']:
-        return config['DeviceProperties']['Add']
-    return {}
+    return device_properties.get('Add', {})
 
-def extract_acpi_quirks(config: Dict[str, Any]) -> Dict[str, Any]:
+def extract_acpi_quirks(acpi: Dict[str, Any]) -> Dict[str, Any]:
     """Extract ACPI.Quirks"""
-    if 'ACPI' in config and 'Quirks' in config['ACPI']:
-        return config['ACPI']['Quirks']
-    return {}
+    return acpi.get('Quirks', {})
+
+# Comment markers of the AMD Vanilla patch set
+_AMD_PATCH_RE = re.compile(r'amd|algrey|cpuid_cores_per_package', re.IGNORECASE)
 
 def detect_amd_patches(patches: List[Dict[str, Any]]) -> bool:
     """Detect if AMD Vanilla patches are present"""
     for patch in patches:
-        comment = patch.get('Comment', '').lower()
-        if 'amd' in comment or 'algrey' in comment or 'cpuid_cores_per_package' in comment:
+        if _AMD_PATCH_RE.search(patch.get('Comment', '')):
             return True
     return False
 
+_PLIST_SECTIONS = ('ACPI', 'Booter', 'DeviceProperties', 'Kernel', 'Misc', 'NVRAM', 'PlatformInfo', 'UEFI')
+
+# (changeset key, source section, extractor, log message), in changeset
+# order. A key of None merges the returned dict into the changeset
+_EXTRACTORS = (
+    ('AcpiAdd', 'ACPI', extract_acpi_add, "Found {n} ACPI files"),
+    ('Kexts', 'Kernel', extract_kexts, "Found {n} kexts"),
+    ('BooterQuirks', 'Booter', extract_booter_quirks, "Found {n} booter quirks"),
+    ('KernelQuirks', 'Kernel', extract_kernel_quirks, "Found {n} kernel quirks"),
+    ('KernelEmulate', 'Kernel', extract_kernel_emulate, "Found kernel emulation settings"),
+    ('KernelPatches', 'Kernel', extract_kernel_patches, "Found {n} kernel patches"),
+    ('PlatformInfo', 'PlatformInfo', extract_platform_info, "Found PlatformInfo configuration"),
+    ('BootArgs', 'BootVars', extract_boot_args, "Found boot args: {value}"),
+    ('Nvram', 'NVRAM', extract_nvram, "Found NVRAM configuration"),
+    (None, 'Misc', extract_misc_settings, None),
+    ('UefiDrivers', 'UEFI', extract_uefi_drivers, "Found {n} UEFI drivers"),
+    (None, 'UEFI', extract_uefi_settings, None),
+    ('DeviceProperties', 'DeviceProperties', extract_device_properties, "Found device properties"),
+    ('AcpiQuirks', 'ACPI', extract_acpi_quirks, "Found {n} ACPI quirks"),
+)
+
 def convert_plist_to_changeset(plist_path: Path, output_name: str = "") -> Dict[str, Any]:
     """Convert a config.plist to changeset format"""
     
@@ -373,98 +440,51 @@ def convert_plist_to_changeset(plist_path: Path, output_name: str = "") -> Dict[
     
     log("Extracting changeset data from plist...")
     
-    changeset = {}
-    
-    # Extract all components
-    acpi_add = extract_acpi_add(config)
-    if acpi_add:
-        changeset['AcpiAdd'] = acpi_add
-        log(f"Found {len(acpi_add)} ACPI files")
-    
-    kexts = extract_kexts(config)
-    if kexts:
-        changeset['Kexts'] = kexts
-        log(f"Found {len(kexts)} kexts")
-    
-    booter_quirks = extract_booter_quirks(config)
-    if booter_quirks:
-        changeset['BooterQuirks'] = booter_quirks
-        log(f"Found {len(booter_quirks)} booter quirks")
+    # Resolve each top-level section once and hand the subtree to its extractors
+    sections = {name: config.get(name, {}) for name in _PLIST_SECTIONS}
+    sections['BootVars'] = sections['NVRAM'].get('Add', {}).get(APPLE_BOOT_VARIABLE_GUID, {})
     
-    kernel_quirks = extract_kernel_quirks(config)
-    if kernel_quirks:
-        changeset['KernelQuirks'] = kernel_quirks
-        log(f"Found {len(kernel_quirks)} kernel quirks")
-    
-    kernel_emulate = extract_kernel_emulate(config)
-    if kernel_emulate:
-        changeset['KernelEmulate'] = kernel_emulate
-        log(f"Found kernel emulation settings")
-    
-    kernel_patches = extract_kernel_patches(config)
-    if kernel_patches:
-        # Check if AMD patches are present
-        if detect_amd_patches(kernel_patches):
+    changeset = {}
+    for key, section, extractor, message in _EXTRACTORS:
+        value = extractor(sections[section])
+        if key is None:
+            # Misc/UEFI extractors return several top-level changeset keys
+            changeset.update(value)
+            continue
+        if not value:
+            continue
+        if key == 'KernelPatches' and detect_amd_patches(value):
             changeset['AmdVanillaPatches'] = False
             log("Detected AMD Vanilla patches - using AmdVanillaPatches flag")
-        else:
-            changeset['KernelPatches'] = kernel_patches
-            log(f"Found {len(kernel_patches)} kernel patches")
-    
-    platform_info = extract_platform_info(config)
-    if platform_info:
-        changeset['PlatformInfo'] = platform_info
-        log("Found PlatformInfo configuration")
-    
-    boot_args = extract_boot_args(config)
-    if boot_args:
-        changeset['BootArgs'] = boot_args
-        log(f"Found boot args: {boot_args}")
-    
-    nvram = extract_nvram(config)
-    if nvram:
-        changeset['Nvram'] = nvram
-        log("Found NVRAM configuration")
-    
-    misc_settings = extract_misc_settings(config)
-    for key, value in misc_settings.items():
+            continue
         changeset[key] = value
+        log(message.format(n=len(value), value=value))
     
-    uefi_drivers = extract_uefi_drivers(config)
-    if uefi_drivers:
-        changeset['UefiDrivers'] = uefi_drivers
-        log(f"Found {len(uefi_drivers)} UEFI drivers")
-    
-    uefi_settings = extract_uefi_settings(config)
-    for key, value in uefi_settings.items():
-        changeset[key] = value
-    
-    device_properties = extract_device_properties(config)
-    if device_properties:
-        changeset['DeviceProperties'] = device_properties
-        log("Found device properties")
-    
-    acpi_quirks = extract_acpi_quirks(config)
-    if acpi_quirks:
-        changeset['AcpiQuirks'] = acpi_quirks
-        log(f"Found {len(acpi_quirks)} ACPI quirks")
-    
-    return changeset
+    return drop_empty_bytes(changeset)
 
 def save_changeset(changeset: Dict[str, Any], output_path: Path) -> bool:
     """Save changeset to YAML file"""
     try:
-        # Convert bytes objects to strings to avoid !!binary YAML formatting
-        changeset_converted = convert_bytes_to_strings(changeset)
-        
+        # Bytes are encoded by ChangesetDumper during the dump itself,
+        # so no converted copy of the changeset is built first
         with open(output_path, 'w') as f:
-            yaml.safe_dump(changeset_converted, f, default_flow_style=False, sort_keys=False, indent=2)
+            yaml.dump(changeset, f, Dumper=ChangesetDumper, default_flow_style=False, sort_keys=False, indent=2)
         log(f"Saved changeset to: {output_path}")
         return True
     except Exception as e:
         error(f"Failed to save changeset: {e}")
         return False
 
+# Converted changesets keyed on the input plist, so re-running on an
+# unchanged config.plist just copies the previous result
+CACHE_DIR = ROOT / "out" / "cache" / "plist-to-changeset"
+
+def _cache_path(plist_path: Path) -> Path:
+    """Cache file for a plist; the key covers this script too so edits invalidate it"""
+    digest = hashlib.sha256(Path(__file__).read_bytes())
+    digest.update(plist_path.read_bytes())
+    return CACHE_DIR / f"{digest.hexdigest()[:16]}.yaml"
+
 def main():
     parser = argparse.ArgumentParser(
         description='Convert OpenCore config.plist to changeset format',
@@ -482,9 +502,13 @@ Examples:
     parser.add_argument('plist_path', help='Path to the config.plist file')
     parser.add_argument('changeset_name', help='Output changeset name (without .yaml extension)')
     parser.add_argument('--force', '-f', action='store_true', help='Overwrite existing changeset')
+    parser.add_argument('--no-cache', action='store_true', help='Always convert, ignoring cached results')
     
     args = parser.parse_args()
     
+    if not yaml.__with_libyaml__:
+        warn("PyYAML was built without libyaml; falling back to the slower pure-Python dumper")
+    
     # Validate input file
     plist_path = Path(args.plist_path)
     if not plist_path.exists():
@@ -506,6 +530,12 @@ Examples:
         error("Use --force to overwrite")
         return 1
     
+    cache_path = _cache_path(plist_path)
+    if not args.no_cache and cache_path.is_file():
+        shutil.copyfile(cache_path, output_path)
+        info(f"Unchanged plist; reused cached changeset for {output_path}")
+        return 0
+    
     # Convert plist to changeset
     changeset = convert_plist_to_changeset(plist_path, output_name)
     
@@ -515,6 +545,11 @@ Examples:
     
     # Save changeset
     if save_changeset(changeset, output_path):
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(output_path, cache_path)
+        except OSError as e:
+            warn(f"Could not cache changeset: {e}")
         info(f"Successfully converted {plist_path} to {output_path}")
         return 0
     else:
@@ -6,19 +6,44 @@ This script tests that a changeset file can be loaded correctly and validates
 its structure and content.
 """
 
+import os
 import sys
+import json
 import yaml
 import argparse
+import datetime
 from pathlib import Path
 
 # Import our common libraries
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from lib import (
-    ROOT, log, warn, error, info,
+    ROOT, log, warn, error, info, CustomJSONEncoder,
     validate_changeset_exists, get_changeset_path
 )
+from lib.changeset import YamlLoader
 
-def test_changeset_parsing(changeset_name):
+# Boot args worth pointing out, in the order they're reported
+_BOOT_ARG_NOTES = (
+    ('agdpmod=pikera', "Found AMD GPU patch flag"),
+    ('-v', "Verbose mode enabled"),
+)
+
+class _EmitJSONEncoder(CustomJSONEncoder):
+    """CustomJSONEncoder that also writes dates, which YAML makes of unquoted ones"""
+    def default(self, obj):
+        if isinstance(obj, datetime.date):
+            return obj.isoformat()
+        return super().default(obj)
+
+def _scan_dir(path):
+    """Map a directory's entry names to DirEntry objects ({} if it doesn't exist)"""
+    try:
+        with os.scandir(path) as it:
+            return {entry.name: entry for entry in it}
+    except (FileNotFoundError, NotADirectoryError):
+        return {}
+
+def test_changeset_parsing(changeset_name, emit_json=False):
     """Test that the changeset is being parsed correctly"""
     log(f"Testing changeset parsing: {changeset_name}")
     
@@ -27,13 +52,17 @@ def test_changeset_parsing(changeset_name):
     
     try:
         with open(changeset_path, 'r') as f:
-            changeset_data = yaml.safe_load(f)
+            changeset_data = yaml.load(f, Loader=YamlLoader)
     except Exception as e:
         error(f"Failed to parse YAML: {e}")
         return False
     
     log("✓ Changeset loaded and parsed successfully")
     
+    if emit_json:
+        # Flat, grep-friendly dump of what was parsed, for CI logs
+        print(json.dumps(changeset_data, cls=_EmitJSONEncoder, indent=2))
+    
     # Test basic structure
     if not isinstance(changeset_data, dict):
         error("Changeset root should be a dictionary")
@@ -91,6 +120,9 @@ def test_kexts_section(kexts_data):
         return False
     
     info(f"Found {len(kexts_data)} kexts:")
+    kexts_dir = ROOT / 'assets' / 'kexts'
+    # List the kexts directory once rather than stat'ing every bundle
+    available = _scan_dir(kexts_dir).keys()
     for i, kext in enumerate(kexts_data):
         if not isinstance(kext, dict):
             error(f"Kext {i} should be a dictionary")
@@ -104,11 +136,11 @@ def test_kexts_section(kexts_data):
         info(f"  - {bundle_name}")
         
         # Check if bundle exists in assets
-        bundle_path = ROOT / 'assets' / 'kexts' / bundle_name
-        if bundle_path.exists():
+        # Plugin bundles (Foo.kext/Contents/PlugIns/Bar.kext) aren't top-level entries
+        if bundle_name in available or ('/' in bundle_name and (kexts_dir / bundle_name).exists()):
             info(f"    ✓ Found in assets")
         else:
-            warn(f"    ! Not found in assets: {bundle_path}")
+            warn(f"    ! Not found in assets: {kexts_dir / bundle_name}")
     
     return True
 
@@ -147,39 +179,11 @@ def test_boot_args_section(boot_args_data):
     
     info(f"  Boot args: {boot_args_data}")
     
-    # Check for common AMD flags
-    if 'agdpmod=pikera' in boot_args_data:
-        info("  ✓ Found AMD GPU patch flag")
-    
-    if '-v' in boot_args_data:
-        info("  ✓ Verbose mode enabled")
-    
-    return True
-    
-    if 'assets' in proxmox_config:
-        print(f"[*] Found {len(proxmox_config['assets'])} assets:")
-        for asset in proxmox_config['assets']:
-            src_relative = asset['src']
-            dest_path = asset['dest']
-            
-            # Handle relative paths properly
-            if src_relative.startswith('./'):
-                src_path = ROOT / src_relative[2:]  # Remove "./" prefix
-            else:
-                src_path = ROOT / src_relative
-            
-            print(f"  - {src_relative} -> {dest_path}")
-            print(f"    Resolved path: {src_path}")
-            print(f"    Exists: {src_path.exists()}")
-            if src_path.exists():
-                print(f"    Size: {src_path.stat().st_size} bytes")
-    
-    if 'conf_overrides' in proxmox_config:
-        print(f"[*] Found {len(proxmox_config['conf_overrides'])} configuration overrides:")
-        for key, value in proxmox_config['conf_overrides'].items():
-            print(f"  - {key} = {value}")
-            if key == 'hostpci0':
-                print(f"    ^^ This should contain romfile=/usr/share/kvm/RX580.rom")
+    # Check for common AMD flags, matching whole arguments only
+    flags = frozenset(boot_args_data.split())
+    for flag, note in _BOOT_ARG_NOTES:
+        if flag in flags:
+            info(f"  ✓ {note}")
     
     return True
 
@@ -199,6 +203,8 @@ def test_proxmox_section(proxmox_data):
             return False
         
         info(f"Found {len(assets)} Proxmox assets:")
+        # One scandir per source directory instead of a stat per asset
+        listings = {}
         for asset in assets:
             if not isinstance(asset, dict):
                 error("Each asset should be a dictionary")
@@ -218,8 +224,16 @@ def test_proxmox_section(proxmox_data):
                 src_path = ROOT / src_relative
             
             info(f"  - {src_relative} -> {dest_path}")
-            if src_path.exists():
-                size = src_path.stat().st_size
+            entries = listings.get(src_path.parent)
+            if entries is None:
+                entries = listings[src_path.parent] = _scan_dir(src_path.parent)
+            entry = entries.get(src_path.name)
+            try:
+                size = entry.stat().st_size if entry is not None else None
+            except FileNotFoundError:
+                # Dangling symlink
+                size = None
+            if size is not None:
                 info(f"    ✓ Source exists ({size} bytes)")
             else:
                 warn(f"    ! Source not found: {src_path}")
@@ -253,11 +267,19 @@ Examples:
         """
     )
     parser.add_argument('changeset', help='Changeset name (without .yaml extension)')
+    parser.add_argument('--require-fast-yaml', action='store_true',
+                        help='Fail if PyYAML was built without libyaml (for CI)')
+    parser.add_argument('--emit-json', action='store_true',
+                        help='Print the parsed changeset as JSON before testing it')
     
     args = parser.parse_args()
     
+    if args.require_fast_yaml and not yaml.__with_libyaml__:
+        error("PyYAML was built without libyaml; reinstall it with the libyaml headers present")
+        sys.exit(1)
+    
     try:
-        if test_changeset_parsing(args.changeset):
+        if test_changeset_parsing(args.changeset, emit_json=args.emit_json):
             log("🎉 All changeset tests passed!")
             sys.exit(0)
         else:
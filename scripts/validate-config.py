@@ -13,7 +13,7 @@ from pathlib import Path
 
 # Import our common libraries
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from lib import ROOT, log, warn, error, info, run_command, paths, validate_file_exists
+from lib import log, warn, error, info, run_command, paths, validate_file_exists
 
 def validate_config(config_path=None):
     """Validate OpenCore configuration using ocvalidate"""
@@ -29,7 +29,7 @@ def validate_config(config_path=None):
         return False
     
     # Find ocvalidate
-    ocvalidate_path = paths.opencore_root / "Utilities" / "ocvalidate" / "ocvalidate"
+    ocvalidate_path = paths.ocvalidate
     if not ocvalidate_path.exists():
         error("ocvalidate not found")
         error(f"Expected at: {ocvalidate_path}")
@@ -41,11 +41,13 @@ def validate_config(config_path=None):
     
     # Run validation
     try:
+        # Absolute paths, no cwd and inherited fds let subprocess use
+        # posix_spawn instead of fork+exec
         result = subprocess.run(
-            [str(ocvalidate_path), str(config_file)],
+            [str(ocvalidate_path), str(config_file.resolve())],
             capture_output=True,
             text=True,
-            cwd=ROOT
+            close_fds=False
         )
         
         # Print output
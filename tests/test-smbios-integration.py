@@ -12,13 +12,25 @@ This validates that the SMBIOS -> NVRAM copying works correctly.
 """
 
 import sys
+import os
+import io
+import shutil
 import tempfile
 import subprocess
+import traceback
+import importlib.util
+import yaml
+from contextlib import redirect_stdout
 from pathlib import Path
 
 # Add lib directory to path
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 from lib import ROOT, log, warn, error, info
+from lib.changeset import YamlLoader
+
+def _decode(output):
+    """Decode captured child output, replacing invalid bytes"""
+    return output.decode('utf-8', errors='replace') if output else ''
 
 def run_command(cmd, description, cwd=None):
     """Run a command and return success status"""
@@ -26,17 +38,56 @@ def run_command(cmd, description, cwd=None):
         cwd = ROOT
     
     log(f"Running: {' '.join(cmd)}")
-    reverse_changeset_file = None
     try:
-        result = subprocess.run(cmd, cwd=cwd, capture_output=True, text=True, check=True)
-        return True, result.stdout, result.stderr
+        # Capture raw bytes and decode each stream once; a stray non-UTF-8
+        # byte in the child's output shouldn't fail the test
+        result = subprocess.run(cmd, cwd=cwd, capture_output=True, check=True)
+        return True, _decode(result.stdout), _decode(result.stderr)
     except subprocess.CalledProcessError as e:
+        stdout, stderr = _decode(e.stdout), _decode(e.stderr)
         error(f"{description} failed with exit code {e.returncode}")
-        if e.stdout:
-            error(f"STDOUT: {e.stdout}")
-        if e.stderr:
-            error(f"STDERR: {e.stderr}")
-        return False, e.stdout, e.stderr
+        if stdout:
+            error(f"STDOUT: {stdout}")
+        if stderr:
+            error(f"STDERR: {stderr}")
+        return False, stdout, stderr
+
+def load_script(name):
+    """Import a script from scripts/ as a module so it can run in-process"""
+    spec = importlib.util.spec_from_file_location(name.replace('-', '_'), ROOT / "scripts" / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def run_script(module, argv, description, stdout_to=None):
+    """Run a script's main() in-process, capturing stdout, and return success status
+
+    With stdout_to, the script writes straight into that file and the
+    returned stdout is empty unless it failed.
+    """
+    log(f"Running: {module.__name__} {' '.join(argv)}")
+    out = open(stdout_to, 'w') if stdout_to is not None else io.StringIO()
+    try:
+        with redirect_stdout(out):
+            rc = module.main(argv)
+    except SystemExit as e:
+        rc = e.code
+    if stdout_to is not None:
+        out.close()
+        stdout = Path(stdout_to).read_text() if rc else ''
+    else:
+        stdout = out.getvalue()
+    if rc:
+        error(f"{description} failed with exit code {rc}")
+        if stdout:
+            error(f"STDOUT: {stdout}")
+        return False, stdout, ''
+    return True, stdout, ''
+
+# read-config only reads the plist, so it runs in this interpreter;
+# apply-changeset stays a subprocess since it exits from deep inside its
+# helpers and writes the build tree
+read_config = load_script("read-config")
 
 def test_smbios_nvram_integration():
     """Test the SMBIOS to NVRAM copying integration"""
@@ -49,6 +100,7 @@ def test_smbios_nvram_integration():
     source_changeset = "pve-smbios-appleid"
     test_changeset = "test-smbios-integration"
     test_changeset_file = ROOT / "config" / "changesets" / f"{test_changeset}.yaml"
+    reverse_changeset_file = ROOT / "config" / "changesets" / f"{test_changeset}-reverse.yaml"
     generated_plist = ROOT / "out" / "build" / "efi" / "EFI" / "OC" / "config.plist"
     
     try:
@@ -59,8 +111,12 @@ def test_smbios_nvram_integration():
             error(f"Source changeset not found: {source_file}")
             return False
         
-        import shutil
-        shutil.copy2(source_file, test_changeset_file)
+        # The test only reads its copy, so a hard link does; copy when the
+        # filesystem can't link
+        try:
+            os.link(source_file, test_changeset_file)
+        except OSError:
+            shutil.copyfile(source_file, test_changeset_file)
         info(f"✓ Copied {source_changeset} to {test_changeset}")
         
         # Step 2: Apply changeset (should copy SMBIOS to NVRAM)
@@ -85,28 +141,23 @@ def test_smbios_nvram_integration():
         
         # Step 3: Convert generated plist back to changeset
         log("Step 3: Converting generated plist back to changeset...")
-        cmd = [
-            sys.executable,
-            str(ROOT / "scripts" / "read-config.py"),
-            str(generated_plist)
-        ]
-        success, stdout, stderr = run_command(cmd, "Convert plist back to changeset")
+        # Write the reverse-converted changeset straight to its file
+        success, stdout, stderr = run_script(
+            read_config,
+            [str(generated_plist)],
+            "Convert plist back to changeset",
+            stdout_to=reverse_changeset_file
+        )
         if not success:
             return False
         
-        # Save the reverse-converted changeset
-        reverse_changeset_file = ROOT / "config" / "changesets" / f"{test_changeset}-reverse.yaml"
-        with open(reverse_changeset_file, 'w') as f:
-            f.write(stdout)
-        
         info("✓ Plist converted back to changeset")
         
         # Step 4: Check that NVRAM section was preserved
         log("Step 4: Checking NVRAM preservation...")
         
-        import yaml
         with open(reverse_changeset_file, 'r') as f:
-            reverse_data = yaml.safe_load(f)
+            reverse_data = yaml.load(f, Loader=YamlLoader)
         
         # Check if NVRAM section exists
         if 'nvram' in reverse_data or 'Nvram' in reverse_data:
@@ -141,16 +192,17 @@ def test_smbios_nvram_integration():
         
     except Exception as e:
         error(f"Integration test failed with exception: {e}")
-        import traceback
         error(traceback.format_exc())
         return False
     
     finally:
         # Clean up test files
-        for cleanup_file in [test_changeset_file, reverse_changeset_file]:
-            if cleanup_file and cleanup_file.exists():
+        for cleanup_file in (test_changeset_file, reverse_changeset_file):
+            try:
                 cleanup_file.unlink()
                 info(f"Cleaned up: {cleanup_file}")
+            except FileNotFoundError:
+                pass
 
 def main():
     """Main test function"""
@@ -6,17 +6,44 @@ Apply changeset → Build ISO → Deploy to Proxmox in one command.
 This handles the complete deployment pipeline to Proxmox VMs.
 """
 
+import os
 import sys
+import hashlib
 import subprocess
 import argparse
+import importlib.util
 from pathlib import Path
 
 # Import our common libraries
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from lib import ROOT, log, warn, error, info, run_command, load_config, get_remote_config, scp, ssh, list_newest_changesets, paths as pm, cleanup_macos_metadata
+from lib import ROOT, log, warn, error, info, run_command, load_config, get_remote_config, rsync, ssh, list_newest_changesets, paths as pm, cleanup_macos_metadata
 from lib.efi_builder import build_iso_artifact, build_img_artifact, build_efi_then_validate
 
-def full_deploy_workflow(changeset_name, force=False, build_only=False, iso_only=False, use_iso=False, local_efi=False):
+APPLY_SCRIPT = pm.scripts / "apply-changeset.py"
+
+# Flag pairs that can't be combined, with the message shown for each
+_CONFLICTING_FLAGS = (
+    ('iso_only', 'force', "Cannot use --iso-only and --force together. --iso-only skips the apply step, making --force redundant."),
+    ('build_only', 'force', "Cannot use --build-only and --force together. --build-only skips the apply step, making --force redundant."),
+    ('iso_only', 'build_only', "Cannot use --iso-only and --build-only together. Choose one build-only mode."),
+)
+
+def apply_changeset(changeset_name, in_process=True):
+    """Run apply-changeset.py for a changeset, in this interpreter unless in_process is False"""
+    if not in_process:
+        cmd = [sys.executable, str(APPLY_SCRIPT), str(changeset_name)]
+        return subprocess.run(cmd, cwd=ROOT).returncode
+    
+    spec = importlib.util.spec_from_file_location("apply_changeset", APPLY_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    # The script bails out with sys.exit() from inside its helpers
+    try:
+        return module.main([str(changeset_name)])
+    except SystemExit as e:
+        return e.code
+
+def full_deploy_workflow(changeset_name, force=False, build_only=False, iso_only=False, use_iso=False, local_efi=False, apply_subprocess=False):
     """Execute the full deployment workflow: changeset → IMG/ISO → Proxmox"""
     
     build_type = "ISO" if use_iso else "IMG"
@@ -31,8 +58,7 @@ def full_deploy_workflow(changeset_name, force=False, build_only=False, iso_only
     else:
         # Step 1: Apply changeset
         log("Step 1/3: Applying changeset...")
-        apply_script = ROOT / "scripts" / "apply-changeset.py"
-        changeset_path = ROOT / "config" / "changesets" / f"{changeset_name}.yaml"
+        changeset_path = pm.changesets / f"{changeset_name}.yaml"
         
         if not changeset_path.exists():
             error(f"Changeset not found: {changeset_path}")
@@ -42,29 +68,34 @@ def full_deploy_workflow(changeset_name, force=False, build_only=False, iso_only
                 error(f"Recent changesets (try one of these): {', '.join(recent)}")
             return False
         
-        cmd = [sys.executable, str(apply_script), str(changeset_name)]
         try:
-            result = subprocess.run(cmd, cwd=ROOT, check=True)
-            log("✓ Changeset applied successfully")
-        except subprocess.CalledProcessError as e:
+            rc = apply_changeset(changeset_name, in_process=not apply_subprocess)
+        except Exception as e:
             error(f"Failed to apply changeset: {e}")
             return False
+        if rc:
+            error(f"Failed to apply changeset (exit code {rc})")
+            return False
+        log("✓ Changeset applied successfully")
     
     # Step 2: Build artifacts or just EFI for local deployment
     if local_efi:
         log("Step 2/2: Building EFI (no artifact) for local deployment...")
-        # If we already applied above, don't apply again inside builder
+        # If we already applied above, don't apply again inside builder.
+        # apply-changeset.py also validated that config.plist, so skip the
+        # builder's second validate-config.py/ocvalidate run
         applied_already = not (iso_only or build_only)
-        if not build_efi_then_validate(changeset_name, force_rebuild=force, no_validate=False, apply_changeset=not applied_already):
+        if not build_efi_then_validate(changeset_name, force_rebuild=force, no_validate=applied_already, apply_changeset=not applied_already):
             return False
         # Deploy locally and finish
         return deploy_to_local_efi(changeset_name)
     else:
         step_num = "1/2" if iso_only else "2/3"
         log(f"Step {step_num}: Building OpenCore {build_type}...")
+        # Step 1's apply already ran validation on this config.plist
         applied_already = not (iso_only or build_only)
-        built = build_iso_artifact(changeset_name, force_rebuild=force, no_validate=False, apply_changeset=not applied_already) if use_iso \
-            else build_img_artifact(changeset_name, force_rebuild=force, no_validate=False, apply_changeset=not applied_already)
+        built = build_iso_artifact(changeset_name, force_rebuild=force, no_validate=applied_already, apply_changeset=not applied_already) if use_iso \
+            else build_img_artifact(changeset_name, force_rebuild=force, no_validate=applied_already, apply_changeset=not applied_already)
         if not built:
             return False
         log(f"✓ {build_type} built successfully")
@@ -117,47 +148,40 @@ def deploy_img(changeset_name, vmid, config):
 
         log(f"Found IMG file: {img_path}")
 
-        # Copy IMG to /tmp on remote host
-        temp_img_path = f"/tmp/{img_filename}"
-        info(f"Copying IMG to {config['host']}:{temp_img_path}")
-
-        if not scp(img_path, temp_img_path):
-            error("Failed to copy IMG to remote host")
-            return False
-
-        log("IMG copied to temporary location")
-
         # Deploy to VM via SSH
-        info(f"Deploying IMG to VM {vmid}")
+        info(f"Deploying IMG to VM {vmid} on {config['host']}")
 
-        # Stop the VM
-        info(f"Stopping VM {vmid}")
-        if not ssh(f"qm stop {vmid}"):
-            warn(f"Could not stop VM {vmid} (may already be stopped)")
+        with open(img_path, 'rb') as f:
+            img_sha256 = hashlib.file_digest(f, 'sha256').hexdigest()
 
-        # Run all VM-side operations in a single SSH session for fewer round-trips
+        # One SSH session streams the image straight into the managed disk,
+        # with no /tmp staging copy; the qm/pvesm calls get /dev/null as
+        # stdin so only tee reads the image, hashing it as it is written
         disk_name = f"opencore-{changeset_name}.raw"
         remote_script = f"""
-            set -e
+            set -e -o pipefail
             echo "Stopping VM {vmid} (ignore if already stopped)" || true
-            qm stop {vmid} || true
+            qm stop {vmid} </dev/null || true
             echo "Allocating managed disk: {disk_name}"
-            if ! pvesm alloc local {vmid} {disk_name} 150M --format raw; then
+            if ! pvesm alloc local {vmid} {disk_name} 150M --format raw </dev/null; then
               echo "Disk may already exist, proceeding"
             fi
             echo "Resolving disk path"
             DISK_REF="local:{vmid}/{disk_name}"
-            DISK_PATH=$(pvesm path "$DISK_REF")
-            echo "Copying image to $DISK_PATH"
-            cp {temp_img_path} "$DISK_PATH"
+            DISK_PATH=$(pvesm path "$DISK_REF" </dev/null)
+            echo "Writing image to $DISK_PATH"
+            WRITTEN_SHA256=$(tee "$DISK_PATH" | sha256sum | cut -d' ' -f1)
+            if [ "$WRITTEN_SHA256" != "{img_sha256}" ]; then
+              echo "Checksum mismatch after writing $DISK_PATH: $WRITTEN_SHA256" >&2
+              exit 1
+            fi
             echo "Configuring VM to use disk"
-            qm set {vmid} --ide0 "$DISK_REF",format=raw,cache=writeback,media=disk
-            echo "Cleaning up temp image"
-            rm -f {temp_img_path} || true
+            qm set {vmid} --ide0 "$DISK_REF",format=raw,cache=writeback,media=disk </dev/null
             echo "Starting VM {vmid}"
-            qm start {vmid}
+            qm start {vmid} </dev/null
         """.strip()
-        if not ssh(f"bash -lc {sh_quote(remote_script)}"):
+        # The image is mostly empty FAT space, so it compresses well
+        if not ssh(f"bash -lc {sh_quote(remote_script)}", stdin=img_path, compress=True):
             error("Remote deployment script failed")
             return False
 
@@ -166,19 +190,15 @@ def deploy_img(changeset_name, vmid, config):
 
     except Exception as e:
         error(f"IMG deployment failed: {e}")
-        # Try to cleanup temp file on error
-        try:
-            ssh(f"rm -f /tmp/{img_filename}")
-        except Exception:
-            pass
         return False
 
 def deploy_iso(changeset_name, vmid, config):
     """Deploy ISO file to Proxmox VM via SSH"""
     try:
-        # Check that ISO file exists (support generic default)
+        # build_iso_artifact always writes pm.opencore_iso; the changeset name
+        # only goes into the uploaded file's name
         iso_filename = f'opencore-{changeset_name}.iso'
-        iso_path = pm.opencore_iso if pm.opencore_iso.exists() else (pm.build_root / iso_filename)
+        iso_path = pm.opencore_iso
 
         if not iso_path.exists():
             error(f"ISO file not found: {iso_path}")
@@ -191,7 +211,9 @@ def deploy_iso(changeset_name, vmid, config):
         remote_iso_path = f"{config['remote_iso_dir']}/{iso_filename}"
         info(f"Copying ISO to {config['host']}:{remote_iso_path}")
 
-        if not scp(iso_path, remote_iso_path):
+        # The ISO stays in the remote ISO store between deploys, so rsync
+        # only has to send the blocks that changed since the last upload
+        if not rsync(iso_path, remote_iso_path, compress=True):
             error("Failed to copy ISO to remote host")
             return False
 
@@ -200,12 +222,7 @@ def deploy_iso(changeset_name, vmid, config):
         # Deploy to VM via SSH
         info(f"Deploying ISO to VM {vmid}")
 
-        # Stop the VM
-        info(f"Stopping VM {vmid}")
-        if not ssh(f"qm stop {vmid}"):
-            warn(f"Could not stop VM {vmid} (may already be stopped)")
-
-        # Configure and start VM in a single SSH session
+        # Stop, configure and start the VM in a single SSH session
         remote_script = f"""
             set -e
             echo "Stopping VM {vmid} (ignore if already stopped)" || true
@@ -256,27 +273,21 @@ Example:
     parser.add_argument('--iso-only', '-i', action='store_true', help='Skip fetch/apply/validation, build ISO and deploy only')
     parser.add_argument('--iso', action='store_true', help='Build ISO instead of IMG (default is IMG)')
     parser.add_argument('--local-efi', action='store_true', help='Deploy locally to mounted EFI (inside VM/Hackintosh)')
+    parser.add_argument('--apply-subprocess', action='store_true', help='Run apply-changeset.py in a separate interpreter')
     
     args = parser.parse_args()
     
     # Validate argument combinations
-    if args.iso_only and args.force:
-        error("Cannot use --iso-only and --force together. --iso-only skips the apply step, making --force redundant.")
-        return 1
-    
-    if args.build_only and args.force:
-        error("Cannot use --build-only and --force together. --build-only skips the apply step, making --force redundant.")
-        return 1
-    
-    if args.iso_only and args.build_only:
-        error("Cannot use --iso-only and --build-only together. Choose one build-only mode.")
-        return 1
+    for first, second, message in _CONFLICTING_FLAGS:
+        if getattr(args, first) and getattr(args, second):
+            error(message)
+            return 1
     
     # When using --iso-only, force ISO mode
     use_iso = args.iso or args.iso_only
     
     try:
-        if full_deploy_workflow(args.changeset, args.force, args.build_only, args.iso_only, use_iso, args.local_efi):
+        if full_deploy_workflow(args.changeset, args.force, args.build_only, args.iso_only, use_iso, args.local_efi, args.apply_subprocess):
             return 0
         else:
             return 1
@@ -291,6 +302,46 @@ def sh_quote(s: str) -> str:
     """Minimal single-arg shell quoting for remote inline scripts."""
     return "'" + s.replace("'", "'\\''") + "'"
 
+def _efi_tree_hash(root: Path) -> str:
+    """sha256 over the relative path and contents of every file under root"""
+    digest = hashlib.sha256()
+    pending = [root]
+    files = []
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    files.append(entry.path)
+    for path in sorted(files):
+        digest.update(os.path.relpath(path, root).encode() + b'\0')
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def _sync_efi_tree(source_efi: Path, target_efi: Path):
+    """Mirror source_efi into target_efi, ignoring Apple metadata files"""
+    import shutil
+    if shutil.which('rsync'):
+        # Only changed files are rewritten. -rt rather than -a: the FAT
+        # volume can't hold owners or permissions, and its 2s timestamps
+        # need a matching modify window
+        result = subprocess.run([
+            'rsync', '-rt', '--delete', '--modify-window=2',
+            '--exclude=._*', '--exclude=__MACOSX', '--exclude=.DS_Store',
+            f'{source_efi}/', f'{target_efi}/'
+        ])
+        if result.returncode == 0:
+            return
+        warn(f"rsync exited with {result.returncode}; falling back to a full copy")
+    # Remove existing EFI folder and copy new, ignoring Apple metadata files
+    if target_efi.exists():
+        # Some volumes can contain broken AppleDouble entries; ignore deletion errors
+        shutil.rmtree(target_efi, ignore_errors=True)
+    ignore = shutil.ignore_patterns('._*', '__MACOSX', '.DS_Store')
+    shutil.copytree(source_efi, target_efi, ignore=ignore)
+
 def deploy_to_local_efi(changeset_name: str) -> bool:
     """Attempt to deploy built EFI to the locally mounted EFI partition.
 
@@ -298,7 +349,6 @@ def deploy_to_local_efi(changeset_name: str) -> bool:
     - Prefer /Volumes/OZZY-OC if present (label used by our images)
     - Else try to mount any EFI partitions and detect one with OC/OpenCore.efi
     """
-    import subprocess, shutil
     target = Path('/Volumes/OZZY-OC')
     source_efi = pm.efi_build / 'EFI'
     if not source_efi.exists():
@@ -312,17 +362,26 @@ def deploy_to_local_efi(changeset_name: str) -> bool:
                 cleanup_macos_metadata(source_efi)
             except Exception:
                 pass
-            # Remove existing EFI folder and copy new, ignoring Apple metadata files
-            if (target / 'EFI').exists():
-                # Some volumes can contain broken AppleDouble entries; ignore deletion errors
-                shutil.rmtree(target / 'EFI', ignore_errors=True)
-            ignore = shutil.ignore_patterns('._*', '__MACOSX', '.DS_Store')
-            shutil.copytree(source_efi, target / 'EFI', ignore=ignore)
-            # Clean up any metadata that slipped through
+            # Skip the copy when this exact tree was the last one deployed
+            tree_hash = _efi_tree_hash(source_efi)
+            hash_file = target / '.ozzy-efi-hash'
             try:
-                cleanup_macos_metadata(target / 'EFI')
-            except Exception:
-                pass
+                deployed_hash = hash_file.read_text().strip()
+            except OSError:
+                deployed_hash = None
+            if deployed_hash == tree_hash and (target / 'EFI').exists():
+                log("EFI unchanged since last deploy, skipping copy")
+            else:
+                _sync_efi_tree(source_efi, target / 'EFI')
+                # Clean up any metadata that slipped through
+                try:
+                    cleanup_macos_metadata(target / 'EFI')
+                except Exception:
+                    pass
+                try:
+                    hash_file.write_text(tree_hash)
+                except Exception:
+                    pass
             # Manage changeset marker at volume root
             for old in target.glob('*.changeset'):
                 try:
@@ -339,19 +398,18 @@ def deploy_to_local_efi(changeset_name: str) -> bool:
         except Exception as e:
             error(f"Failed to deploy to local EFI: {e}")
             return False
-    # Fallback: try to mount common EFI mountpoint
-    # Attempt to mount diskXs1 where X from diskutil list
+    # Fallback: mount every EFI partition diskutil reports, then retry
     try:
-        result = subprocess.run(['diskutil', 'list'], capture_output=True, text=True)
-        candidates = []
-        for line in result.stdout.splitlines():
-            line = line.strip()
-            if line.endswith('EFI') and 'EFI' in line and 'disk' in line:
-                # crude parse: look for diskXs1 pattern in the line
-                parts = line.split()
-                for p in parts:
-                    if p.startswith('disk') and 's' in p:
-                        candidates.append(p)
+        import plistlib
+        result = subprocess.run(['diskutil', 'list', '-plist'], capture_output=True)
+        disks = plistlib.loads(result.stdout).get('AllDisksAndPartitions', [])
+        candidates = [
+            part['DeviceIdentifier']
+            for disk in disks
+            for part in disk.get('Partitions', [])
+            if part.get('Content') == 'EFI' and 'DeviceIdentifier' in part
+        ]
+        # diskutil mount takes one device per call
         for dev in candidates:
             subprocess.run(['diskutil', 'mount', dev], capture_output=True)
         # Retry preferred mount
@@ -9,39 +9,88 @@ This is one of the main workflows requested by the user.
 import sys
 import subprocess
 import argparse
-import glob
 import os
+import json
+import shutil
+import zipfile
+import importlib.util
 from pathlib import Path
 
 # Import our common libraries
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from lib import ROOT, log, warn, error, info, run_command, list_newest_changesets
+from lib import ROOT, log, warn, error, info, list_newest_changesets
+from lib.changeset import YamlLoader
 import yaml
 
+# Repos whose kexts are fetched into build-type specific out/kext-<type>-<repo> directories
+KEXT_REPOS = ("acidanthera_Lilu", "acidanthera_NVMeFix", "acidanthera_VirtualSMC",
+              "acidanthera_WhateverGreen", "acidanthera_RestrictEvents", "acidanthera_AppleALC")
+
+def link_or_copy(src, dst):
+    """Hard-link src to dst, copying when the filesystem can't link"""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+def copy_into(sources, target_dir, description):
+    """Copy files or bundles into target_dir, keeping their names
+
+    Bundle contents are hard-linked where possible; nothing edits them in
+    place after they're populated.
+    """
+    if not sources:
+        return
+    log(description)
+    for source in sources:
+        target = target_dir / source.name
+        try:
+            if source.is_dir():
+                shutil.copytree(source, target, symlinks=True, dirs_exist_ok=True, copy_function=link_or_copy)
+            else:
+                shutil.copy2(source, target)
+        except OSError as e:
+            error(f"Failed to copy {source.name}: {e}")
+
+def first_existing(locations, parent_dirs):
+    """Return the first of locations that exists, or None
+
+    Most candidates sit in directories that were never fetched; whether a
+    parent directory exists is checked once and kept in parent_dirs, so those
+    candidates are skipped without a stat each. Candidates in existing
+    directories still go through exists(), which keeps the filesystem's own
+    case handling and ignores dangling symlinks.
+    """
+    for location in locations:
+        parent_exists = parent_dirs.get(location.parent)
+        if parent_exists is None:
+            parent_exists = parent_dirs[location.parent] = location.parent.is_dir()
+        if parent_exists and location.exists():
+            return location
+    return None
+
 def populate_efi_assets(changeset_name):
     """Populate EFI directory structure with kexts, drivers, tools, and ACPI files"""
     
     # Load the changeset to see what assets we need
     changeset_path = ROOT / "config" / "changesets" / f"{changeset_name}.yaml"
     with open(changeset_path, 'r') as f:
-        changeset_data = yaml.safe_load(f)
+        changeset_data = yaml.load(f, Loader=YamlLoader)
     
     efi_base = ROOT / "out" / "build" / "efi" / "EFI"
     oc_dir = efi_base / "OC"
+    # Parent directory existence shared by the source lookups below
+    parent_dirs = {}
     
-    # Ensure directories exist and clean up any old kext files
-    (oc_dir / "Kexts").mkdir(parents=True, exist_ok=True)
-    (oc_dir / "Drivers").mkdir(parents=True, exist_ok=True)
-    (oc_dir / "Tools").mkdir(parents=True, exist_ok=True)
-    (oc_dir / "ACPI").mkdir(parents=True, exist_ok=True)
-    (efi_base / "BOOT").mkdir(parents=True, exist_ok=True)
+    # Ensure directories exist; Kexts is recreated empty below
+    for directory in (oc_dir / "Drivers", oc_dir / "Tools", oc_dir / "ACPI", efi_base / "BOOT"):
+        directory.mkdir(parents=True, exist_ok=True)
     
     # Clean up existing kext directory to ensure only changeset kexts are present
-    import shutil
     kexts_dir = oc_dir / "Kexts"
     if kexts_dir.exists():
         shutil.rmtree(kexts_dir)
-    kexts_dir.mkdir(parents=True, exist_ok=True)
+    kexts_dir.mkdir()
     
     # Copy kexts
     if 'Kexts' in changeset_data:
@@ -51,7 +100,6 @@ def populate_efi_assets(changeset_name):
         sources_path = ROOT / "config" / "sources.json"
         kext_build_types = {}
         if sources_path.exists():
-            import json
             with open(sources_path) as f:
                 sources_data = json.load(f)
                 for kext_config in sources_data.get('kexts', []):
@@ -59,17 +107,18 @@ def populate_efi_assets(changeset_name):
                     build_type = kext_config.get('build_type', 'RELEASE').lower()
                     kext_build_types[kext_name] = build_type
         
+        kext_sources = []
         for kext in changeset_data['Kexts']:
             kext_name = kext['bundle']
             build_type = kext_build_types.get(kext_name, 'release')
+            kext_stem = kext_name.replace('.kext', '')
             
             # Look for kext in various possible locations with build type awareness
             source_locations = []
             
             # First try the new build-type specific directories
-            for repo_suffix in ["acidanthera_Lilu", "acidanthera_NVMeFix", "acidanthera_VirtualSMC", 
-                               "acidanthera_WhateverGreen", "acidanthera_RestrictEvents", "acidanthera_AppleALC"]:
-                if kext_name.replace('.kext', '').lower() in repo_suffix.lower():
+            for repo_suffix in KEXT_REPOS:
+                if kext_stem.lower() in repo_suffix.lower():
                     source_locations.extend([
                         ROOT / "out" / f"kext-{build_type}-{repo_suffix}" / kext_name,
                         ROOT / "out" / f"kext-{build_type}-{repo_suffix}" / "Kexts" / kext_name,  # VirtualSMC layout
@@ -77,9 +126,9 @@ def populate_efi_assets(changeset_name):
             
             # Fallback to old patterns and generic patterns
             source_locations.extend([
-                ROOT / "out" / f"kext-release-acidanthera_{kext_name.replace('.kext', '')}" / kext_name,
-                ROOT / "out" / f"kext-release-acidanthera_{kext_name.replace('.kext', '')}" / "Kexts" / kext_name,  # VirtualSMC layout
-                ROOT / "out" / f"kext-{kext_name.replace('.kext', '')}" / kext_name,
+                ROOT / "out" / f"kext-release-acidanthera_{kext_stem}" / kext_name,
+                ROOT / "out" / f"kext-release-acidanthera_{kext_stem}" / "Kexts" / kext_name,  # VirtualSMC layout
+                ROOT / "out" / f"kext-{kext_stem}" / kext_name,
                 ROOT / "assets" / kext_name
             ])
             
@@ -87,31 +136,34 @@ def populate_efi_assets(changeset_name):
             if kext_name == "AppleMCEReporterDisabler.kext":
                 zip_path = ROOT / "assets" / "AppleMCEReporterDisabler.kext.zip"
                 if zip_path.exists():
-                    # Extract the zip to a temporary location
-                    import zipfile
+                    # Extract the zip to a temporary location, unless the
+                    # same zip was already extracted there
                     temp_extract_path = ROOT / "out" / "temp_kext_extract"
                     temp_extract_path.mkdir(exist_ok=True)
-                    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                        zip_ref.extractall(temp_extract_path)
                     extracted_kext = temp_extract_path / kext_name
+                    marker = temp_extract_path / ".zip-stamp"
+                    zip_stat = zip_path.stat()
+                    stamp = f"{zip_stat.st_mtime_ns}-{zip_stat.st_size}"
+                    if not (extracted_kext.exists() and marker.exists() and marker.read_text() == stamp):
+                        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+                            zip_ref.extractall(temp_extract_path)
+                        marker.write_text(stamp)
                     if extracted_kext.exists():
                         source_locations.insert(0, extracted_kext)  # Add as first priority
             
-            source_kext = None
-            for location in source_locations:
-                if location.exists():
-                    source_kext = location
-                    break
+            source_kext = first_existing(source_locations, parent_dirs)
             
             if source_kext:
-                target_kext = oc_dir / "Kexts" / kext_name
-                run_command(f'rsync -av --delete "{source_kext}/" "{target_kext}/"', f"Copying {kext_name}")
+                kext_sources.append(source_kext)
             else:
                 warn(f"Kext not found: {kext_name} (searched in {len(source_locations)} locations)")
+        
+        copy_into(kext_sources, oc_dir / "Kexts", f"Copying {len(kext_sources)} kexts")
     
     # Copy drivers
     if 'UefiDrivers' in changeset_data:
         log("Copying UEFI drivers...")
+        driver_sources = []
         for driver in changeset_data['UefiDrivers']:
             driver_name = driver['path']
             # Look for drivers in various locations
@@ -121,21 +173,19 @@ def populate_efi_assets(changeset_name):
                 ROOT / "out" / "opencore" / "Drivers" / driver_name,
             ]
             
-            source_driver = None
-            for location in source_locations:
-                if location.exists():
-                    source_driver = location
-                    break
+            source_driver = first_existing(source_locations, parent_dirs)
                     
             if source_driver:
-                target_driver = oc_dir / "Drivers" / driver_name
-                run_command(f'cp "{source_driver}" "{target_driver}"', f"Copying {driver_name}")
+                driver_sources.append(source_driver)
             else:
                 warn(f"Driver not found: {driver_name}")
+        
+        copy_into(driver_sources, oc_dir / "Drivers", f"Copying {len(driver_sources)} drivers")
 
     # Copy tools
     if 'MiscTools' in changeset_data:
         log("Copying tools...")
+        tool_sources = []
         for tool in changeset_data['MiscTools']:
             tool_name = tool['Path']
             # Look for tools in various locations
@@ -145,19 +195,19 @@ def populate_efi_assets(changeset_name):
                 ROOT / "out" / "opencore" / "Tools" / tool_name,
             ]
             
-            source_tool = None
-            for location in source_locations:
-                if location.exists():
-                    source_tool = location
-                    break
+            source_tool = first_existing(source_locations, parent_dirs)
                     
             if source_tool:
-                target_tool = oc_dir / "Tools" / tool_name
-                run_command(f'cp "{source_tool}" "{target_tool}"', f"Copying {tool_name}")
+                tool_sources.append(source_tool)
             else:
-                warn(f"Tool not found: {tool_name}")    # Copy ACPI files
+                warn(f"Tool not found: {tool_name}")
+        
+        copy_into(tool_sources, oc_dir / "Tools", f"Copying {len(tool_sources)} tools")
+    
+    # Copy ACPI files
     if 'AcpiAdd' in changeset_data:
         log("Copying ACPI files...")
+        acpi_sources = []
         for acpi_file in changeset_data['AcpiAdd']:
             # Look for ACPI files in multiple locations
             source_locations = [
@@ -167,39 +217,50 @@ def populate_efi_assets(changeset_name):
                 ROOT / "out" / "acpi" / acpi_file
             ]
             
-            source_acpi = None
-            for location in source_locations:
-                if location.exists():
-                    source_acpi = location
-                    break
+            source_acpi = first_existing(source_locations, parent_dirs)
             
             if source_acpi:
-                target_acpi = oc_dir / "ACPI" / acpi_file
-                run_command(f'cp "{source_acpi}" "{target_acpi}"', f"Copying {acpi_file}")
+                acpi_sources.append(source_acpi)
             else:
                 warn(f"ACPI file not found: {acpi_file} (searched in {len(source_locations)} locations)")
+        
+        copy_into(acpi_sources, oc_dir / "ACPI", f"Copying {len(acpi_sources)} ACPI files")
     
     # Copy OpenCore bootloader files correctly
     log("Copying OpenCore bootloader...")
     
     # Copy the proper UEFI boot stub (BOOTx64.efi) 
     bootx64_source = ROOT / "out" / "opencore" / "X64" / "EFI" / "BOOT" / "BOOTx64.efi"
-    target_bootloader = efi_base / "BOOT" / "BOOTx64.efi"
     
     if bootx64_source.exists():
-        run_command(f'cp "{bootx64_source}" "{target_bootloader}"', "Copying OpenCore bootloader to BOOT")
+        copy_into([bootx64_source], efi_base / "BOOT", "Copying OpenCore bootloader to BOOT")
     else:
         warn(f"BOOTx64.efi not found at {bootx64_source}")
     
     # Copy OpenCore.efi to OC directory
     opencore_source = ROOT / "out" / "opencore" / "X64" / "EFI" / "OC" / "OpenCore.efi"
-    target_oc = oc_dir / "OpenCore.efi"
     
     if opencore_source.exists():
-        run_command(f'cp "{opencore_source}" "{target_oc}"', "Copying OpenCore.efi to OC")
+        copy_into([opencore_source], oc_dir, "Copying OpenCore.efi to OC")
     else:
         warn(f"OpenCore.efi not found at {opencore_source}")
 
+def run_script(name, argv=None):
+    """Run scripts/<name>.py's main() in this interpreter and return its exit code
+
+    Saves starting a new interpreter and re-importing yaml/lxml per step.
+    The scripts bail out with sys.exit() from inside their helpers, so that
+    is turned back into a return code.
+    """
+    spec = importlib.util.spec_from_file_location(name.replace('-', '_'), ROOT / "scripts" / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    try:
+        rc = module.main() if argv is None else module.main(argv)
+    except SystemExit as e:
+        rc = e.code
+    return rc or 0
+
 def full_usb_workflow(changeset_name, output_path=None, force=False, eject=False):
     """Execute the full USB workflow: changeset → USB → Deploy"""
     
@@ -207,7 +268,6 @@ def full_usb_workflow(changeset_name, output_path=None, force=False, eject=False
     
     # Step 1: Apply changeset
     log("Step 1/3: Applying changeset...")
-    apply_script = ROOT / "scripts" / "apply-changeset.py"
     changeset_path = ROOT / "config" / "changesets" / f"{changeset_name}.yaml"
     
     if not changeset_path.exists():
@@ -218,13 +278,15 @@ def full_usb_workflow(changeset_name, output_path=None, force=False, eject=False
             error(f"Recent changesets (try one of these): {', '.join(recent)}")
         return False
     
-    cmd = [sys.executable, str(apply_script), changeset_name]  # Pass just the name, not the path
     try:
-        result = subprocess.run(cmd, cwd=ROOT, check=True)
-        log("✓ Changeset applied successfully")
-    except subprocess.CalledProcessError as e:
+        rc = run_script("apply-changeset", [changeset_name])  # Pass just the name, not the path
+    except Exception as e:
         error(f"Failed to apply changeset: {e}")
         return False
+    if rc:
+        error(f"Failed to apply changeset (exit code {rc})")
+        return False
+    log("✓ Changeset applied successfully")
     
     # Step 1.5: Populate EFI structure with assets
     log("Step 1.5/3: Populating EFI structure with assets...")
@@ -237,55 +299,62 @@ def full_usb_workflow(changeset_name, output_path=None, force=False, eject=False
     
     # Step 2: Create USB structure (skip ISO building for USB workflow)
     log("Step 2/3: Creating USB EFI structure...")
-    build_usb_script = ROOT / "scripts" / "build-usb.py"
-    cmd = [sys.executable, str(build_usb_script), changeset_name]
+    build_usb_args = [changeset_name]
     
     if output_path:
-        cmd.extend(["--output", output_path])
+        build_usb_args.extend(["--output", output_path])
     if force:
-        cmd.append("--force")
+        build_usb_args.append("--force")
     
     try:
-        result = subprocess.run(cmd, cwd=ROOT, check=True)
-        log("✓ USB structure created successfully")
-    except subprocess.CalledProcessError as e:
+        rc = run_script("build-usb", build_usb_args)
+    except Exception as e:
         error(f"Failed to create USB structure: {e}")
         return False
+    if rc:
+        error(f"Failed to create USB structure (exit code {rc})")
+        return False
+    log("✓ USB structure created successfully")
     
     # Step 3: Deploy to USB (if Install volume is available)
     log("------------------------------------------------")
     log("Step 3/3: Deploying EFI to USB Install volume...")
-    deploy_usb_script = ROOT / "scripts" / "deploy-usb.py"
-    cmd = [sys.executable, str(deploy_usb_script)]
-    
     try:
-        result = subprocess.run(cmd, cwd=ROOT, check=True)
-        # log("✓ EFI deployed to USB successfully")
-        
-        # Eject volumes if requested
-        if eject:
-            log("Ejecting volumes...")
-            try:
-                # Find and eject Install volumes
-                install_volumes = glob.glob("/Volumes/Install*")
-                for volume in install_volumes:
-                    log(f"Ejecting {volume}")
-                    subprocess.run(["diskutil", "eject", volume], check=True)
-                
-                # Eject EFI volume if mounted
-                efi_volume = "/Volumes/EFI"
-                if os.path.exists(efi_volume):
-                    log(f"Ejecting {efi_volume}")
-                    subprocess.run(["diskutil", "eject", efi_volume], check=True)
-                
-                warn("✓ Volumes ejected successfully")
-            except subprocess.CalledProcessError as e:
-                error(f"Failed to eject some volumes: {e}")
-                
-    except subprocess.CalledProcessError as e:
+        rc = run_script("deploy-usb")
+        reason = f"exit code {rc}"
+    except Exception as e:
+        rc, reason = 1, e
+    
+    if rc:
         # Don't fail the whole workflow if USB deployment fails (USB might not be plugged in)
-        warn(f"USB deployment failed (this is OK if no Install USB is connected): {e}")
+        warn(f"USB deployment failed (this is OK if no Install USB is connected): {reason}")
         log("You can run 'python3 scripts/deploy-usb.py' manually when your Install USB is ready")
+    elif eject:
+        # Eject volumes if requested
+        log("Ejecting volumes...")
+        try:
+            # Find Install volumes and the EFI volume (if mounted) in one pass
+            install_volumes = []
+            efi_volumes = []
+            with os.scandir("/Volumes") as entries:
+                for entry in entries:
+                    if entry.name.startswith("Install"):
+                        install_volumes.append(entry.path)
+                    elif entry.name == "EFI":
+                        efi_volumes.append(entry.path)
+            
+            # Eject Install volumes, then the EFI volume. Ejecting an Install
+            # volume takes the rest of its disk with it, so the EFI volume
+            # may be gone by the time we get to it
+            for volume in install_volumes + efi_volumes:
+                if volume in efi_volumes and not os.path.exists(volume):
+                    continue
+                log(f"Ejecting {volume}")
+                subprocess.run(["diskutil", "eject", volume], check=True)
+            
+            warn("✓ Volumes ejected successfully")
+        except (subprocess.CalledProcessError, OSError) as e:
+            error(f"Failed to eject some volumes: {e}")
     
     info("Your USB-ready EFI structure is ready for deployment")
     log("🎉 Full USB workflow completed successfully!")
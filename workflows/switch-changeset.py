@@ -14,6 +14,7 @@ from pathlib import Path
 # Import our common libraries
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from lib import ROOT, log, warn, error, info, run_command, list_available_changesets, list_newest_changesets
+from lib.changeset import YamlLoader
 
 def switch_changeset(changeset_name, force=False):
     """Switch to a different changeset with validation and feedback"""
@@ -38,7 +39,7 @@ def switch_changeset(changeset_name, force=False):
     try:
         import yaml
         with open(changeset_path, 'r') as f:
-            changeset_data = yaml.safe_load(f)
+            changeset_data = yaml.load(f, Loader=YamlLoader)
         
         if 'metadata' in changeset_data:
             metadata = changeset_data['metadata']